@@ -0,0 +1,282 @@
+"""Hot-path benchmark: corpus load/save, message picking, quiet hours and formatting.
+
+Run from the repository root:
+
+    python benchmarks/bench_hot_paths.py                    # compare against benchmarks/baselines.json
+    python benchmarks/bench_hot_paths.py --save-baseline    # record new baselines
+    python benchmarks/bench_hot_paths.py --sizes 1000 10000 --only random
+
+Every benchmark runs against synthetic CSV corpora (1k to 1M messages by default) in a
+temporary directory, so the real corpus and state files are never touched. A benchmark
+whose p50 latency or peak memory grows by more than --threshold over its baseline is
+reported as a regression and the script exits with status 1.
+"""
+import argparse
+import csv
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_FILE = os.path.join(REPO_DIR, 'benchmarks', 'baselines.json')
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+BUDGET_SECONDS = 2.0    # Time spent sampling each benchmark (at least MIN_RUNS samples)
+MIN_RUNS = 3
+MAX_RUNS = 10_000
+THRESHOLD = 0.20        # Relative slowdown / memory growth that counts as a regression
+HAIKU_SHARE = 0.2       # Fraction of the synthetic corpus that is haikus
+SEED = 1337
+USER_ID = '123456789012345678'
+
+WORDS = ("beeg summon discord offline online girlfriend server channel ping vanished "
+         "return emergency breaking news sighting ritual candle circle silent absent "
+         "legend rumor mist morning voice chat game night weekend lurking").split()
+
+
+def write_corpus(size, rng):
+    """Write synthetic phrase and haiku CSVs with `size` messages in total"""
+    haikus = int(size * HAIKU_SHARE)
+    with open('beeg_summoning_phrases.csv', 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['number', 'phrase'])
+        for number in range(1, size - haikus + 1):
+            words = rng.choices(WORDS, k=rng.randint(6, 18))
+            words.insert(rng.randrange(len(words)), f'<@{USER_ID}>')
+            writer.writerow([number, ' '.join(words).capitalize()])
+    with open('beeg_summoning_haikus.csv', 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['number', 'haiku'])
+        for number in range(size - haikus + 1, size + 1):
+            lines = [' '.join(rng.choices(WORDS, k=rng.randint(2, 5))) for _ in range(3)]
+            lines[0] = f'<@{USER_ID}> {lines[0]}'
+            writer.writerow([number, ' / '.join(lines)])
+
+
+def remove(*paths):
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def measure(func, setup=None, budget=BUDGET_SECONDS):
+    """Time `func` repeatedly (after `setup`, which isn't timed), then once more under tracemalloc"""
+    samples = []
+    deadline = time.perf_counter() + budget
+    gc.collect()
+    while len(samples) < MIN_RUNS or (time.perf_counter() < deadline and len(samples) < MAX_RUNS):
+        if setup:
+            setup()
+        started = time.perf_counter_ns()
+        func()
+        samples.append(time.perf_counter_ns() - started)
+
+    # Peak memory is taken from a separate run since tracemalloc slows everything down
+    if setup:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    samples.sort()
+    mean = sum(samples) / len(samples)
+    return {
+        'runs': len(samples),
+        'ops_per_s': 1e9 / mean if mean else float('inf'),
+        'p50_us': percentile(samples, 0.50) / 1e3,
+        'p95_us': percentile(samples, 0.95) / 1e3,
+        'p99_us': percentile(samples, 0.99) / 1e3,
+        'peak_kib': peak / 1024,
+    }
+
+
+def corpus_benchmarks(main, size, budget, wanted):
+    """Benchmarks whose cost depends on the corpus size"""
+    bot = main.BeegSummoningBot()
+    state_files = (main.MESSAGES_FILE, main.USED_MESSAGES_FILE, main.BOT_DATA_FILE)
+    rng = random.Random(SEED)
+
+    def fresh_state():
+        remove(*state_files)
+        bot.used_messages = set()
+
+    def half_used():
+        # A realistic steady state: half the corpus already used, so picks never trigger a reset
+        bot.used_messages = set(rng.sample(range(1, size + 1), size // 2))
+
+    results = {}
+
+    def run(name, func, setup=None):
+        if wanted(name):
+            results[f'{name}@{size}'] = measure(func, setup=setup, budget=budget)
+
+    run('load_summoning_messages_from_csv', bot.load_summoning_messages_from_csv)
+    # Cold: no messages.json yet, so the CSVs are parsed and the JSON written out
+    run('load_data_cold', bot.load_data, setup=fresh_state)
+    # Warm: a normal restart, everything comes from the JSON state files
+    bot.last_message_time = bot.beeg_offline_since = datetime.now()
+    bot.beeg_current_status = 'offline'
+    half_used()
+    bot.save_messages()
+    bot.save_used_messages()
+    bot.save_bot_data()
+    run('load_data_warm', bot.load_data)
+
+    run('save_messages', bot.save_messages)
+    half_used()
+    run('save_used_messages', bot.save_used_messages)
+    run('save_bot_data', bot.save_bot_data)
+    run('get_random_message', bot.get_random_message, setup=half_used)
+    return results
+
+
+def fixed_benchmarks(main, budget, wanted):
+    """Benchmarks that don't depend on the corpus size"""
+    bot = main.BeegSummoningBot()
+    rng = random.Random(SEED)
+    start = datetime(2025, 1, 1)
+    # Lookups within a week, like the bot's (now, or a summon interval ahead), so they share a compiled table
+    moments = [start + timedelta(minutes=rng.randrange(60 * 24 * 7)) for _ in range(1024)]
+    messages = [
+        {'id': 1, 'text': f'Breaking news: <@{USER_ID}> spotted in the wild', 'type': 'phrase'},
+        {'id': 2, 'text': f'<@{USER_ID}> has vanished\nLike morning mist\nDiscord grows silent', 'type': 'haiku'},
+    ]
+    mention = '<@987654321098765432>'
+    batch = 1000  # Calls per sample, these are far too quick to time one at a time
+
+    def quiet_hours():
+        for when in moments[:batch]:
+            bot.is_do_not_disturb_time(when)
+
+    def next_allowed():
+        for when in moments[:batch]:
+            bot.get_next_allowed_summon_time(when)
+
+    def format_auto():
+        for i in range(batch):
+            bot.format_summoning_message(messages[i & 1])
+
+    def format_manual():
+        for i in range(batch):
+            bot.format_summoning_message(messages[i & 1], manual=True, mention=mention)
+
+    results = {}
+    for name, func in (('is_do_not_disturb_time', quiet_hours),
+                       ('get_next_allowed_summon_time', next_allowed),
+                       ('format_summoning_message', format_auto),
+                       ('format_summoning_message_manual', format_manual)):
+        if not wanted(name):
+            continue
+        result = measure(func, budget=budget)
+        # Report per call rather than per batch
+        for key in ('p50_us', 'p95_us', 'p99_us'):
+            result[key] /= batch
+        result['ops_per_s'] *= batch
+        results[name] = result
+    return results
+
+
+def git_version():
+    try:
+        result = subprocess.run(['git', 'describe', '--always', '--dirty', '--tags'],
+                                cwd=REPO_DIR, capture_output=True, text=True)
+        return result.stdout.strip() or 'unknown'
+    except OSError:
+        return 'unknown'
+
+
+def load_baselines():
+    if not os.path.exists(BASELINE_FILE):
+        return {}
+    with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f).get('results', {})
+
+
+def compare(key, result, baseline, threshold):
+    """Regression messages for one benchmark (empty if it's within the threshold)"""
+    problems = []
+    for metric, label in (('p50_us', 'p50 latency'), ('peak_kib', 'peak memory')):
+        old, new = baseline.get(metric), result[metric]
+        # Ignore tiny absolute values where timer and allocator noise dominate
+        if old and new > old * (1 + threshold) and new - old > (0.05 if metric == 'p50_us' else 16):
+            problems.append(f"{key}: {label} {old:.1f} -> {new:.1f} (+{100 * (new / old - 1):.0f}%)")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='corpus sizes to test')
+    parser.add_argument('--only', help='only run benchmarks whose name contains this')
+    parser.add_argument('--budget', type=float, default=BUDGET_SECONDS, help='seconds of sampling per benchmark')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='relative growth that counts as a regression (default 0.2 = 20%%)')
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the new baselines')
+    args = parser.parse_args()
+
+    print("⏱️ Beeg Summoning Bot hot-path benchmark")
+    print("=" * 50)
+
+    os.environ.setdefault('BEEG_USER_ID', USER_ID)
+    sys.path.insert(0, REPO_DIR)
+    def wanted(name):
+        return not args.only or args.only in name
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        # The bot uses relative paths for its corpus and state files
+        os.chdir(workdir)
+        import main as bot_main
+
+        results.update(fixed_benchmarks(bot_main, args.budget, wanted))
+        for size in sorted(args.sizes):
+            print(f"📝 Generating {size:,} message corpus...")
+            write_corpus(size, random.Random(SEED))
+            results.update(corpus_benchmarks(bot_main, size, args.budget, wanted))
+        os.chdir(REPO_DIR)
+
+    baselines = load_baselines()
+    regressions = []
+    print(f"\n{'benchmark':44s} {'ops/s':>12s} {'p50 µs':>11s} {'p95 µs':>11s} {'p99 µs':>11s} {'peak KiB':>10s}")
+    for key, r in results.items():
+        line = (f"{key:44s} {r['ops_per_s']:>12,.1f} {r['p50_us']:>11,.1f} {r['p95_us']:>11,.1f} "
+                f"{r['p99_us']:>11,.1f} {r['peak_kib']:>10,.1f}")
+        if key in baselines:
+            change = 100 * (r['p50_us'] / baselines[key]['p50_us'] - 1) if baselines[key]['p50_us'] else 0.0
+            line += f"   ({change:+.1f}% p50)"
+            regressions.extend(compare(key, r, baselines[key], args.threshold))
+        print(line)
+
+    if args.save_baseline:
+        stored = load_baselines()
+        stored.update(results)
+        with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'version': git_version(), 'timestamp': datetime.now().isoformat(),
+                       'results': stored}, f, indent=2)
+        print(f"\n✅ Saved baselines to {os.path.relpath(BASELINE_FILE, REPO_DIR)}")
+    elif not baselines:
+        print("\n💡 No baselines yet, run with --save-baseline to record some")
+
+    if regressions and not args.save_baseline:
+        print(f"\n❌ {len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for problem in regressions:
+            print(f"  {problem}")
+        sys.exit(1)
+    elif baselines and not args.save_baseline:
+        print(f"\n✅ No regressions over {args.threshold:.0%}")
+
+
+if __name__ == '__main__':
+    main()
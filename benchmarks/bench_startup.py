@@ -0,0 +1,159 @@
+"""Startup benchmark: import cost, deferred state load and (optionally) time-to-ready.
+
+Run from the repository root:
+
+    python benchmarks/bench_startup.py            # import + state load only
+    python benchmarks/bench_startup.py --live     # also connect to Discord (needs BOT_TOKEN)
+
+Every run is appended to benchmarks/startup_history.jsonl so releases can be compared.
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HISTORY_FILE = os.path.join(REPO_DIR, 'benchmarks', 'startup_history.jsonl')
+CORPUS_FILES = ['beeg_summoning_phrases.csv', 'beeg_summoning_haikus.csv']
+COG_MODULES = ['cogs.summoning', 'cogs.cleanup', 'cogs.admin', 'cogs.status']
+REPEATS = 5
+
+
+def child_env():
+    env = dict(os.environ)
+    env.setdefault('BEEG_USER_ID', '123456789012345678')
+    env['PYTHONPATH'] = REPO_DIR + os.pathsep + env.get('PYTHONPATH', '')
+    return env
+
+
+def run_child(code, cwd=REPO_DIR, importtime=False):
+    """Run a snippet in a fresh interpreter and return (wall seconds, stdout, stderr)"""
+    args = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+    started = time.perf_counter()
+    result = subprocess.run(args, cwd=cwd, env=child_env(), capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"Benchmark child failed:\n{result.stderr[-2000:]}")
+    return elapsed, result.stdout, result.stderr
+
+
+def import_cost(module):
+    """Median cumulative import time of a module in microseconds (from -X importtime)"""
+    samples = []
+    for _ in range(REPEATS):
+        _, _, stderr = run_child(f'import {module}', importtime=True)
+        for line in stderr.splitlines():
+            match = re.match(r'import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)$', line)
+            if match and match.group(2) == module:
+                samples.append(int(match.group(1)))
+    return statistics.median(samples) if samples else None
+
+
+def process_start_to_import():
+    """Median wall time for a fresh interpreter to import main (what you wait for before connecting)"""
+    return statistics.median(run_child('import main')[0] for _ in range(REPEATS))
+
+
+def state_load_time():
+    """Median time of the deferred corpus/state load, from a cold cache (CSV parse + JSON write)"""
+    code = ("import time, main\n"
+            "started = time.perf_counter()\n"
+            "main.summoning_bot.load_data()\n"
+            "print(time.perf_counter() - started)\n")
+    samples = []
+    for _ in range(REPEATS):
+        with tempfile.TemporaryDirectory() as workdir:
+            for name in CORPUS_FILES:
+                if os.path.exists(os.path.join(REPO_DIR, name)):
+                    shutil.copy(os.path.join(REPO_DIR, name), workdir)
+            _, stdout, _ = run_child(code, cwd=workdir)
+            samples.append(float(stdout.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def time_to_ready():
+    """Connect for real and time process start -> on_ready -> state loaded (needs BOT_TOKEN)"""
+    code = ("import time\n"
+            "started = time.perf_counter()\n"
+            "import asyncio, json, main\n"
+            "async def run():\n"
+            "    async with main.bot:\n"
+            "        client = asyncio.create_task(main.bot.start(main.DISCORD_TOKEN))\n"
+            "        await main.bot.wait_until_ready()\n"
+            "        ready = time.perf_counter() - started\n"
+            "        await main.summoning_bot.data_loaded.wait()\n"
+            "        loaded = time.perf_counter() - started\n"
+            "        await main.bot.close()\n"
+            "        await client\n"
+            "    print(json.dumps({'ready': ready, 'state_loaded': loaded}))\n"
+            "asyncio.run(run())\n")
+    _, stdout, _ = run_child(code)
+    return json.loads(stdout.strip().splitlines()[-1])
+
+
+def git_version():
+    try:
+        result = subprocess.run(['git', 'describe', '--always', '--dirty', '--tags'],
+                                cwd=REPO_DIR, capture_output=True, text=True)
+        return result.stdout.strip() or 'unknown'
+    except OSError:
+        return 'unknown'
+
+
+def last_result():
+    if not os.path.exists(HISTORY_FILE):
+        return None
+    with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
+        lines = [line for line in f if line.strip()]
+    return json.loads(lines[-1]) if lines else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--live', action='store_true', help='also measure time-to-ready against Discord')
+    parser.add_argument('--no-save', action='store_true', help="don't append to the history file")
+    args = parser.parse_args()
+
+    print("⏱️ Beeg Summoning Bot startup benchmark")
+    print("=" * 50)
+
+    metrics = {
+        'import_main_wall_s': process_start_to_import(),
+        'import_main_us': import_cost('main'),
+        'state_load_s': state_load_time(),
+    }
+    for module in COG_MODULES:
+        metrics[f'import_{module}_us'] = import_cost(module)
+
+    if args.live:
+        if not os.getenv('BOT_TOKEN'):
+            print("❌ --live needs BOT_TOKEN in the environment or .env")
+        else:
+            live = time_to_ready()
+            metrics['time_to_ready_s'] = live['ready']
+            metrics['time_to_state_loaded_s'] = live['state_loaded']
+
+    previous = last_result()
+    for name, value in metrics.items():
+        line = f"{name:36s} {value:>14.4f}" if isinstance(value, float) else f"{name:36s} {value!s:>14}"
+        if previous and isinstance(value, (int, float)) and previous['metrics'].get(name):
+            change = 100 * (value - previous['metrics'][name]) / previous['metrics'][name]
+            line += f"   ({change:+.1f}% vs {previous['version']})"
+        print(line)
+
+    if not args.no_save:
+        entry = {'version': git_version(), 'timestamp': datetime.now().isoformat(), 'metrics': metrics}
+        with open(HISTORY_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+        print(f"\n✅ Saved to {os.path.relpath(HISTORY_FILE, REPO_DIR)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+"""Command cogs, loaded on demand by main.py (see COMMAND_COGS)"""
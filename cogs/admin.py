@@ -0,0 +1,130 @@
+import os
+
+import discord
+from discord.ext import commands
+
+from cogs.common import reply
+from config import MESSAGES_FILE, USED_MESSAGES_FILE
+
+
+class Admin(commands.Cog):
+    """Admin-only maintenance commands"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.summoning_bot = bot.summoning_bot
+
+    @commands.command(name='reload_messages')
+    @commands.has_permissions(administrator=True)
+    async def reload_messages(self, ctx):
+        """Reload summoning messages from CSV files (admin only)"""
+        try:
+            # Force reload from CSV
+            self.summoning_bot.set_summoning_messages(self.summoning_bot.load_summoning_messages_from_csv())  # Saves to JSON and reindexes
+            self.summoning_bot.used_messages.clear()  # Reset used messages since we have new content
+            self.summoning_bot.save_used_messages()
+
+            total_messages = len(self.summoning_bot.summoning_messages)
+            phrases = len([m for m in self.summoning_bot.summoning_messages if m['type'] == 'phrase'])
+            haikus = len([m for m in self.summoning_bot.summoning_messages if m['type'] == 'haiku'])
+
+            await reply(ctx, f"✅ **Messages reloaded from CSV files!**\n"
+                          f"📝 Total: {total_messages} ({phrases} phrases, {haikus} haikus)\n"
+                          f"🔄 Used message list reset")
+
+            # Delete the user's command message
+            try:
+                await ctx.message.delete()
+            except discord.errors.NotFound:
+                pass
+
+        except Exception as e:
+            await reply(ctx, f"❌ **Error reloading messages:** {e}")
+
+    @commands.command(name='force_csv_reload')
+    @commands.has_permissions(administrator=True)
+    async def force_csv_reload(self, ctx):
+        """Delete JSON cache and force reload from CSV files (admin only)"""
+        try:
+            # Delete the JSON files to force fresh load
+            if os.path.exists(MESSAGES_FILE):
+                os.remove(MESSAGES_FILE)
+            if os.path.exists(USED_MESSAGES_FILE):
+                os.remove(USED_MESSAGES_FILE)
+
+            # Reload everything
+            self.summoning_bot.set_summoning_messages(self.summoning_bot.load_summoning_messages_from_csv())
+            self.summoning_bot.used_messages.clear()
+            self.summoning_bot.save_used_messages()
+
+            total_messages = len(self.summoning_bot.summoning_messages)
+            phrases = len([m for m in self.summoning_bot.summoning_messages if m['type'] == 'phrase'])
+            haikus = len([m for m in self.summoning_bot.summoning_messages if m['type'] == 'haiku'])
+
+            await reply(ctx, f"✅ **Forced fresh reload from CSV files!**\n"
+                          f"📝 Total: {total_messages} ({phrases} phrases, {haikus} haikus)\n"
+                          f"🗑️ Deleted old cache files\n"
+                          f"🔄 Used message list reset")
+
+            # Delete the user's command message
+            try:
+                await ctx.message.delete()
+            except discord.errors.NotFound:
+                pass
+
+        except Exception as e:
+            await reply(ctx, f"❌ **Error during force reload:** {e}")
+
+    @commands.command(name='debug_messages')
+    @commands.has_permissions(administrator=True)
+    async def debug_messages(self, ctx):
+        """Show sample of loaded messages for debugging (admin only)"""
+        if not self.summoning_bot.summoning_messages:
+            await reply(ctx, "❌ No messages loaded!")
+            return
+
+        # Show first 3 messages as examples
+        sample_messages = self.summoning_bot.summoning_messages[:3]
+        debug_text = "🔍 **Debug: Sample loaded messages**\n"
+
+        for msg in sample_messages:
+            debug_text += f"\n**ID {msg['id']} ({msg['type']}):**\n"
+            debug_text += f"```{msg['text'][:100]}{'...' if len(msg['text']) > 100 else ''}```"
+
+        await reply(ctx, debug_text)
+
+    @commands.command(name='force_summon_check')
+    @commands.has_permissions(administrator=True)
+    async def force_summon_check(self, ctx):
+        """Force check Beeg's status and restart summoning if needed (admin only)"""
+        old_status = self.summoning_bot.beeg_current_status
+        await self.summoning_bot.check_initial_beeg_status()
+        new_status = self.summoning_bot.beeg_current_status
+
+        await reply(ctx, f"🔍 **Status check complete!**\n"
+                       f"Previous: {old_status}\n"
+                       f"Current: {new_status}\n"
+                       f"Summoning active: {self.summoning_bot.summoning_task is not None and not self.summoning_bot.summoning_task.done()}")
+
+        # Delete the user's command message
+        try:
+            await ctx.message.delete()
+        except discord.errors.NotFound:
+            pass
+
+    @commands.command(name='stop_summoning')
+    @commands.has_permissions(administrator=True)
+    async def stop_summoning(self, ctx):
+        """Stop automatic summoning (admin only)"""
+        await self.summoning_bot.stop_summoning_cycle()
+        await reply(ctx, "🛑 **Automatic summoning stopped!** Beeg is safe... for now.")
+
+        # Delete the user's command message
+        try:
+            await ctx.message.delete()
+        except discord.errors.NotFound:
+            pass
+
+
+async def setup(bot):
+    await bot.add_cog(Admin(bot))
@@ -0,0 +1,265 @@
+import asyncio
+
+import discord
+from discord.ext import commands
+
+from cogs.common import reply
+from config import GUILD_CLEANUP_CONCURRENCY, GUILD_CLEANUP_MAX_DELETES, GUILD_CLEANUP_PROGRESS_SECONDS
+
+
+class DeleteBudget:
+    """Delete allowance shared by every channel in a cleanup run"""
+    def __init__(self, total):
+        self.remaining = total
+        self.deleted = 0
+
+    def take(self):
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+class Cleanup(commands.Cog):
+    """Commands for deleting the bot's own messages"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.active_guild_cleanups = {}  # Guild id -> running guild-wide cleanup task (for /cleanup_cancel)
+
+    async def find_bot_messages(self, channel, limit=None, skip_ids=()):
+        """The bot's messages in a channel, newest first (from the sent index when it covers the channel)
+
+        `skip_ids` are left out entirely, e.g. the progress message of the cleanup that's running.
+        """
+        sent_index = self.bot.sent_index
+        if limit is None:
+            message_ids = sent_index.message_ids(channel.id)
+            if message_ids is not None:
+                # Snowflake ids are time-ordered, so no history fetch is needed at all
+                message_ids = [message_id for message_id in reversed(message_ids) if message_id not in skip_ids]
+                # ...except to check the newest one (the one we keep) wasn't deleted while we weren't looking
+                while message_ids:
+                    try:
+                        await channel.fetch_message(message_ids[0])
+                        break
+                    except discord.errors.NotFound:
+                        sent_index.forget(channel.id, [message_ids.pop(0)])
+                return [channel.get_partial_message(message_id) for message_id in message_ids]
+
+        # Collect bot messages
+        bot_messages = []
+        async for message in channel.history(limit=limit):
+            if message.author == self.bot.user:
+                bot_messages.append(message)
+
+        if limit is None:
+            # A full scan found everything, from now on the index alone is enough for this channel
+            sent_index.seed(channel.id, [message.id for message in bot_messages])
+
+        # Sort by timestamp (newest first)
+        bot_messages.sort(key=lambda m: m.created_at, reverse=True)
+        return [message for message in bot_messages if message.id not in skip_ids]
+
+    async def delete_own_message(self, message):
+        """Delete one of the bot's own replies and drop it from the sent index straight away"""
+        await message.delete()
+        self.bot.sent_index.forget(message.channel.id, [message.id])
+
+    # Helper function for cleanup commands
+    async def delete_bot_messages_except_latest(self, channel, limit=None, budget=None, skip_ids=()):
+        """Delete all bot messages except the most recent one (ignoring `skip_ids`)"""
+        bot_messages = await self.find_bot_messages(channel, limit, skip_ids)
+        messages_to_delete = bot_messages[1:]  # Skip the newest message
+
+        deleted_count = 0
+        gone = []
+        try:
+            for message in messages_to_delete:
+                if budget is not None and not budget.take():
+                    break  # Shared delete budget used up
+                try:
+                    await message.delete()
+                    deleted_count += 1
+                    gone.append(message.id)
+                    if budget is not None:
+                        budget.deleted += 1
+                    await asyncio.sleep(0.5)  # Rate limiting
+                except discord.errors.NotFound:
+                    gone.append(message.id)  # Message already deleted
+                except Exception as e:
+                    print(f"Error deleting message: {e}")
+        finally:
+            self.bot.sent_index.forget(channel.id, gone)
+
+        return deleted_count
+
+    @commands.command(name='cleanup')
+    async def cleanup_bot_messages(self, ctx, limit: int = 10):
+        """Delete the bot's recent messages except the latest one (default: last 10 messages)"""
+        if limit > 50:
+            await reply(ctx, "❌ Limit too high! Maximum 50 messages at once.")
+            return
+
+        try:
+            deleted_count = await self.delete_bot_messages_except_latest(ctx.channel, limit=100)
+
+            if deleted_count > 0:
+                # Send confirmation (this will auto-delete after 5 seconds)
+                confirmation = await reply(ctx, f"🗑️ Deleted {deleted_count} bot messages (kept the latest one)!")
+                if confirmation:
+                    await asyncio.sleep(5)
+                    await self.delete_own_message(confirmation)
+            else:
+                await reply(ctx, "ℹ️ No bot messages found to delete.")
+
+            # Delete the user's command message
+            try:
+                await ctx.message.delete()
+            except discord.errors.NotFound:
+                pass  # Message already deleted
+            except Exception as e:
+                print(f"Error deleting command message: {e}")
+
+        except discord.errors.Forbidden:
+            await reply(ctx, "❌ Bot doesn't have permission to delete messages in this channel.")
+        except Exception as e:
+            await reply(ctx, f"❌ Error deleting messages: {e}")
+
+    @commands.command(name='cleanup_all')
+    async def cleanup_all_bot_messages(self, ctx):
+        """Delete ALL bot messages except the latest one in this channel (use with caution!)"""
+        try:
+            # Confirm before mass deletion
+            confirm_msg = await reply(ctx, "⚠️ This will delete ALL bot messages except the latest one in this channel. React with ✅ to confirm (30 second timeout)")
+            if confirm_msg is None:
+                return
+            await confirm_msg.add_reaction("✅")
+
+            def check(reaction, user):
+                return user == ctx.author and str(reaction.emoji) == "✅" and reaction.message.id == confirm_msg.id
+
+            try:
+                await self.bot.wait_for('reaction_add', timeout=30.0, check=check)
+            except asyncio.TimeoutError:
+                await confirm_msg.edit(content="❌ Cleanup cancelled (timeout)")
+                return
+
+            await self.delete_own_message(confirm_msg)
+
+            # Delete all bot messages except the latest one
+            deleted_count = await self.delete_bot_messages_except_latest(ctx.channel)
+
+            # Send final confirmation
+            final_msg = await reply(ctx, f"🗑️ Cleanup complete! Deleted {deleted_count} bot messages (kept the latest one).")
+            if final_msg:
+                await asyncio.sleep(5)
+                await self.delete_own_message(final_msg)
+
+            # Delete the user's command message
+            try:
+                await ctx.message.delete()
+            except discord.errors.NotFound:
+                pass  # Message already deleted
+            except Exception as e:
+                print(f"Error deleting command message: {e}")
+
+        except discord.errors.Forbidden:
+            await reply(ctx, "❌ Bot doesn't have permission to delete messages in this channel.")
+        except Exception as e:
+            await reply(ctx, f"❌ Error during cleanup: {e}")
+
+    async def cleanup_guild_channels(self, guild, budget, progress, skip_ids=()):
+        """Clean up every readable text channel in a guild, a few channels at a time"""
+        semaphore = asyncio.Semaphore(GUILD_CLEANUP_CONCURRENCY)
+
+        async def clean_channel(channel):
+            async with semaphore:
+                if budget.remaining <= 0:
+                    return
+                try:
+                    await self.delete_bot_messages_except_latest(channel, budget=budget, skip_ids=skip_ids)
+                except discord.errors.Forbidden:
+                    pass  # Can't read this channel's history
+                except Exception as e:
+                    print(f"Error cleaning up #{channel.name}: {e}")
+                finally:
+                    progress['channels_done'] += 1
+
+        channels = [channel for channel in guild.text_channels
+                    if channel.permissions_for(guild.me).read_message_history]
+        progress['channels_total'] = len(channels)
+        await asyncio.gather(*(clean_channel(channel) for channel in channels))
+
+    @commands.command(name='cleanup_guild')
+    @commands.has_permissions(manage_messages=True)
+    async def cleanup_guild(self, ctx, max_deletes: int = GUILD_CLEANUP_MAX_DELETES):
+        """Delete bot messages (except the latest) in every channel of this server (manage messages only)"""
+        if ctx.guild is None:
+            await reply(ctx, "❌ This command only works in a server.")
+            return
+
+        running = self.active_guild_cleanups.get(ctx.guild.id)
+        if running and not running.done():
+            await reply(ctx, "⚠️ A server-wide cleanup is already running. Use `/cleanup_cancel` to stop it.")
+            return
+
+        budget = DeleteBudget(max_deletes)
+        progress = {'channels_done': 0, 'channels_total': 0}
+        status_msg = await reply(ctx, f"🧹 Starting server-wide cleanup (up to {max_deletes} deletions)...")
+
+        # The progress message is newer than everything else, it mustn't count as the one to keep
+        skip_ids = {status_msg.id} if status_msg else set()
+        task = asyncio.create_task(self.cleanup_guild_channels(ctx.guild, budget, progress, skip_ids))
+        self.active_guild_cleanups[ctx.guild.id] = task
+
+        # Report progress until the cleanup finishes or is cancelled
+        while not task.done():
+            await asyncio.wait({task}, timeout=GUILD_CLEANUP_PROGRESS_SECONDS)
+            if status_msg and not task.done():
+                try:
+                    await status_msg.edit(content=f"🧹 Cleaning up... {progress['channels_done']}/{progress['channels_total']} channels, "
+                                                  f"{budget.deleted} messages deleted")
+                except discord.errors.HTTPException:
+                    pass
+
+        self.active_guild_cleanups.pop(ctx.guild.id, None)
+
+        if task.cancelled():
+            summary = (f"🛑 Server-wide cleanup cancelled after {progress['channels_done']}/{progress['channels_total']} channels. "
+                       f"Deleted {budget.deleted} bot messages.")
+        else:
+            summary = (f"🗑️ Server-wide cleanup complete! Deleted {budget.deleted} bot messages "
+                       f"across {progress['channels_total']} channels (kept the latest one in each).")
+            if budget.remaining <= 0:
+                summary += "\n⚠️ Delete budget reached - run it again to continue."
+
+        if status_msg:
+            try:
+                await status_msg.edit(content=summary)
+            except discord.errors.HTTPException:
+                pass
+        else:
+            await reply(ctx, summary)
+
+        # Delete the user's command message
+        try:
+            await ctx.message.delete()
+        except discord.errors.NotFound:
+            pass
+
+    @commands.command(name='cleanup_cancel')
+    @commands.has_permissions(manage_messages=True)
+    async def cleanup_cancel(self, ctx):
+        """Cancel a running server-wide cleanup (manage messages only)"""
+        task = self.active_guild_cleanups.get(ctx.guild.id) if ctx.guild else None
+        if task is None or task.done():
+            await reply(ctx, "ℹ️ No server-wide cleanup is running.")
+            return
+
+        task.cancel()
+        await reply(ctx, "🛑 Cancelling server-wide cleanup...", delete_after=5)
+
+
+async def setup(bot):
+    await bot.add_cog(Cleanup(bot))
@@ -0,0 +1,9 @@
+from outbox import PRIORITY_HOUSEKEEPING
+
+
+async def reply(ctx, content, priority=PRIORITY_HOUSEKEEPING, persist=False, delete_after=None):
+    """Send a command response through the outbox and return the sent message (or None)
+
+    Replies aren't persisted by default: one still queued at shutdown would be stale after a restart.
+    """
+    return await ctx.bot.outbox.send(ctx.channel, content, priority, persist, delete_after)
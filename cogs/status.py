@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta
+
+from discord.ext import commands
+
+from cogs.common import reply
+from config import BEEG_USER_ID
+
+
+def format_duration(seconds):
+    """Format seconds as e.g. '2d 3h 15m'"""
+    minutes = int(seconds // 60)
+    days, minutes = divmod(minutes, 24 * 60)
+    hours, minutes = divmod(minutes, 60)
+    if days:
+        return f"{days}d {hours}h {minutes}m"
+    if hours:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m"
+
+
+class Status(commands.Cog):
+    """Commands reporting on Beeg and the summoning schedule"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.summoning_bot = bot.summoning_bot
+
+    @commands.command(name='beeg_status')
+    async def beeg_status(self, ctx):
+        """Check if Beeg is online or offline"""
+        user = self.bot.get_user(BEEG_USER_ID)
+        if user is None:
+            await reply(ctx, "❌ Could not find Beeg!")
+            return
+
+        current_status = self.summoning_bot.get_user_status(BEEG_USER_ID)
+
+        # Status emoji and text
+        if current_status == 'offline':
+            status_emoji = "💤"
+            status_text = "OFFLINE (prime summoning time!)"
+        elif current_status == 'online':
+            status_emoji = "✅"
+            status_text = "ONLINE (summoning successful!)"
+        elif current_status == 'idle':
+            status_emoji = "🌙"
+            status_text = "IDLE (maybe summoning will work?)"
+        elif current_status == 'dnd':
+            status_emoji = "🔴"
+            status_text = "DO NOT DISTURB (summoning may anger the Beeg)"
+        else:
+            status_emoji = "❓"
+            status_text = "UNKNOWN (Schrödinger's Beeg)"
+
+        # Add offline duration if applicable
+        offline_info = ""
+        if current_status == 'offline' and self.summoning_bot.beeg_offline_since:
+            delta = datetime.now() - self.summoning_bot.beeg_offline_since
+            hours = int(delta.total_seconds() // 3600)
+            minutes = int((delta.total_seconds() % 3600) // 60)
+            if hours > 0:
+                offline_info = f"\n⏰ Offline for: {hours}h {minutes}m"
+            else:
+                offline_info = f"\n⏰ Offline for: {minutes}m"
+
+            # Add summoning status
+            if self.summoning_bot.summoning_task and not self.summoning_bot.summoning_task.done():
+                offline_info += "\n🔮 Auto-summoning: ACTIVE"
+            else:
+                offline_info += "\n🔮 Auto-summoning: INACTIVE"
+
+        # Add do-not-disturb status
+        dnd_info = ""
+        if self.summoning_bot.is_do_not_disturb_time():
+            next_allowed = self.summoning_bot.get_next_allowed_summon_time()
+            dnd_info = f"\n🌙 Do-not-disturb active until {next_allowed.strftime('%a %H:%M')}"
+
+        await reply(ctx, f"{status_emoji} **Beeg is currently: {status_text}**{offline_info}{dnd_info}")
+
+    @commands.command(name='beeg_history')
+    async def beeg_history(self, ctx, days: int = 7):
+        """Show Beeg's online/offline history for the last N days (default: 7)"""
+        if days < 1:
+            await reply(ctx, "❌ Days must be at least 1.")
+            return
+
+        end = datetime.now()
+        start = end - timedelta(days=days)
+        summary = self.summoning_bot.presence_timeline.summary(BEEG_USER_ID, start.timestamp(), end.timestamp())
+
+        tracked = summary['offline'] + summary['online']
+        if tracked == 0:
+            await reply(ctx, f"📜 No presence history recorded for the last {days} day(s) yet.")
+            return
+
+        offline_share = 100 * summary['offline'] / tracked
+        history_text = (f"📜 **Beeg's last {days} day(s)** 📜\n"
+                        f"💤 Offline: {summary['offline'] / 3600:.1f}h ({offline_share:.0f}% of tracked time)\n"
+                        f"✅ Online: {summary['online'] / 3600:.1f}h\n"
+                        f"🏜️ Longest absence: {format_duration(summary['longest_absence']) if summary['longest_absence'] else 'none ended in this period'}")
+        if summary['current_absence']:
+            history_text += f"\n⏰ Current absence: {format_duration(summary['current_absence'])} and counting"
+
+        await reply(ctx, history_text)
+
+    @commands.command(name='dnd_status')
+    async def dnd_status(self, ctx):
+        """Check current do-not-disturb status"""
+        current_time = datetime.now()
+        is_dnd = self.summoning_bot.is_do_not_disturb_time()
+
+        if is_dnd:
+            next_allowed = self.summoning_bot.get_next_allowed_summon_time()
+            time_remaining = next_allowed - current_time
+            hours = int(time_remaining.total_seconds() // 3600)
+            minutes = int((time_remaining.total_seconds() % 3600) // 60)
+
+            await reply(ctx, f"🌙 **Do-not-disturb is ACTIVE**\n"
+                          f"⏰ Quiet hours: {self.summoning_bot.describe_quiet_hours()}\n"
+                          f"🔔 Next summon allowed: {next_allowed.strftime('%a %H:%M')}\n"
+                          f"⏳ Time remaining: {hours}h {minutes}m")
+        else:
+            await reply(ctx, f"☀️ **Do-not-disturb is INACTIVE**\n"
+                          f"⏰ Quiet hours: {self.summoning_bot.describe_quiet_hours()}\n"
+                          f"✅ Auto-summoning is allowed right now!")
+
+
+async def setup(bot):
+    await bot.add_cog(Status(bot))
@@ -0,0 +1,124 @@
+from typing import Optional
+
+import discord
+from discord.ext import commands
+
+from cogs.common import reply
+from config import BEEG_USER_ID
+from outbox import PRIORITY_MANUAL, PRIORITY_HOUSEKEEPING
+
+
+class Summoning(commands.Cog):
+    """Manual summons and message rotation commands"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.summoning_bot = bot.summoning_bot
+
+    @commands.command(name='summon')
+    async def summon_command(self, ctx, user: Optional[discord.Member] = None, message_id: Optional[int] = None):
+        """Manual summon command: /summon [@username] [message id]"""
+        if user is None:
+            # Default to Beeg if no user specified
+            user = self.bot.get_user(BEEG_USER_ID)
+            if user is None:
+                await reply(ctx, "❌ Could not find the target user!")
+                return
+
+        # Throttle spam before doing any work (no message pick, no file writes)
+        allowed, reason, retry_after = self.bot.summon_throttle.check(ctx.author.id, ctx.channel.id, user.id)
+        if not allowed:
+            if self.bot.summon_throttle.should_notify(ctx.author.id):
+                if reason == 'duplicate':
+                    notice = f"🔁 {user.display_name} was just summoned here, hold your horses!"
+                else:
+                    notice = f"⏳ Summoning circle is recharging ({reason} limit), try again in {int(retry_after) + 1}s."
+                # Fire-and-forget, not persisted, and deletes itself
+                self.bot.outbox.enqueue(ctx.channel, notice, PRIORITY_HOUSEKEEPING, persist=False, delete_after=10)
+            return
+
+        if message_id is not None and self.summoning_bot.message_index.get(message_id) is None:
+            await reply(ctx, f"❌ No summoning message #{message_id}! Try `/summon_search <keywords>`.")
+            return
+
+        # Check if it's do-not-disturb time for automatic summons
+        guild_id = ctx.guild.id if ctx.guild else None
+        if self.summoning_bot.is_do_not_disturb_time(target_id=user.id, guild_id=guild_id):
+            next_allowed = self.summoning_bot.get_next_allowed_summon_time(target_id=user.id, guild_id=guild_id)
+            await reply(ctx, f"🌙 **Do-not-disturb time active!**\n"
+                          f"⏰ Quiet hours: {self.summoning_bot.describe_quiet_hours(user.id, guild_id)}\n"
+                          f"🔔 Next summon allowed at: {next_allowed.strftime('%a %H:%M')}\n"
+                          f"💡 *Manual summons still work during quiet hours*")
+
+        # Get the requested message, or a random one
+        if message_id is not None:
+            message_data = self.summoning_bot.get_message_by_id(message_id)
+        else:
+            message_data = self.summoning_bot.get_random_message()
+
+        # Replace any existing mentions in the message with the target user
+        formatted_message = self.summoning_bot.format_summoning_message(message_data, manual=True, mention=user.mention)
+
+        await reply(ctx, formatted_message, PRIORITY_MANUAL, persist=True)  # A summon is still worth sending after a restart
+        print(f"Manual summon used by {ctx.author} targeting {user.display_name}")
+
+    @commands.command(name='summon_search')
+    async def summon_search(self, ctx, *, keywords: str):
+        """Find summoning messages by keyword: /summon_search girlfriend dimension"""
+        results = self.summoning_bot.message_index.search(keywords, limit=5)
+        # Echoed text must not ping anyone (e.g. /summon_search @everyone, or Beeg's mention in a preview)
+        keywords = discord.utils.escape_mentions(keywords)
+        if not results:
+            await reply(ctx, f"🔍 No summoning messages match **{keywords}**.")
+            return
+
+        search_text = f"🔍 **Summoning messages matching \"{keywords}\":**\n"
+        for msg in results:
+            preview = discord.utils.escape_mentions(msg['text'].replace('\n', ' / '))
+            search_text += f"\n**#{msg['id']}** ({msg['type']}): {preview[:100]}{'...' if len(preview) > 100 else ''}"
+        search_text += "\n\n💡 *Use `/summon [@user] <id>` to send one of these*"
+
+        await reply(ctx, search_text)
+
+    @commands.command(name='summon_stats')
+    async def summon_stats(self, ctx):
+        """Show summoning statistics"""
+        total_messages = len(self.summoning_bot.summoning_messages)
+        used_messages = len(self.summoning_bot.used_messages)
+        remaining = total_messages - used_messages
+
+        phrases = len([m for m in self.summoning_bot.summoning_messages if m['type'] == 'phrase'])
+        haikus = len([m for m in self.summoning_bot.summoning_messages if m['type'] == 'haiku'])
+
+        last_time = self.summoning_bot.last_message_time
+        last_time_str = last_time.strftime("%Y-%m-%d %H:%M:%S") if last_time else "Never"
+
+        # Do-not-disturb status
+        dnd_status = "🌙 ACTIVE" if self.summoning_bot.is_do_not_disturb_time() else "☀️ INACTIVE"
+
+        stats_message = (f"📊 **Beeg Summoning Stats** 📊\n"
+                        f"📝 Total messages: {total_messages} ({phrases} phrases, {haikus} haikus)\n"
+                        f"✅ Used messages: {used_messages}\n"
+                        f"⏳ Remaining: {remaining}\n"
+                        f"🕐 Last auto-summon: {last_time_str}\n"
+                        f"🔕 Do-not-disturb ({self.summoning_bot.describe_quiet_hours()}): {dnd_status}")
+
+        await reply(ctx, stats_message)
+
+    @commands.command(name='reset_summons')
+    @commands.has_permissions(administrator=True)
+    async def reset_summons(self, ctx):
+        """Reset the used messages list (admin only)"""
+        self.summoning_bot.used_messages.clear()
+        self.summoning_bot.save_used_messages()
+        await reply(ctx, "🔄 **Summoning messages reset!** All messages are now available again.")
+
+        # Delete the user's command message
+        try:
+            await ctx.message.delete()
+        except discord.errors.NotFound:
+            pass
+
+
+async def setup(bot):
+    await bot.add_cog(Summoning(bot))
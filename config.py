@@ -0,0 +1,57 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Bot configuration
+DISCORD_TOKEN = os.getenv('BOT_TOKEN')
+BEEG_USER_ID = int(os.getenv('BEEG_USER_ID'))  # Replace with Beeg's actual user ID
+DESTINATION_CHANNEL_NAME = 'general'  # Channel name to send messages to
+SUMMON_INTERVAL_HOURS = 3 # How often to summon when offline
+# 'fixed' = summon every SUMMON_INTERVAL_HOURS, 'predictive' = within each interval pick the hour
+# Beeg is most likely to be online, based on recorded presence history (needs numpy)
+SUMMON_SCHEDULE_MODE = 'fixed'
+
+# Guild-wide cleanup configuration
+GUILD_CLEANUP_CONCURRENCY = 4        # Channels scanned at the same time
+GUILD_CLEANUP_MAX_DELETES = 500      # Default delete budget shared by all channels
+GUILD_CLEANUP_PROGRESS_SECONDS = 3   # How often the progress message is updated
+
+# Do not disturb hours configuration (24-hour format)
+DO_NOT_DISTURB_START_HOUR = 0   # Midnight (0)
+DO_NOT_DISTURB_END_HOUR = 7     # 7 AM
+QUIET_HOURS_TIMEZONE = os.getenv('QUIET_HOURS_TIMEZONE')  # e.g. 'Europe/London' (default: server local time)
+QUIET_HOURS_FILE = 'quiet_hours.json'  # Optional per-target/per-guild/weekday windows (replaces the default window)
+
+# High availability: run several replicas, only the lease holder summons and answers commands
+HA_MODE = os.getenv('HA_MODE', 'off').lower() in ('1', 'true', 'on')
+
+# File paths for data persistence
+MESSAGES_FILE = 'summoning_messages.json'
+USED_MESSAGES_FILE = 'used_messages.json'
+BOT_DATA_FILE = 'bot_data.json'
+NEAR_DUPLICATES_FILE = 'near_duplicates.json'  # Written by find_near_duplicates.py
+
+# What to do with near-duplicate messages when loading from CSV:
+# 'off' = ignore, 'tag' = keep but never serve them back to back, 'dedupe' = keep one per cluster
+NEAR_DUPLICATE_MODE = 'tag'
+
+# Command -> extension that defines it. Cogs are imported the first time one of their commands is used.
+COMMAND_COGS = {
+    'summon': 'cogs.summoning',
+    'summon_search': 'cogs.summoning',
+    'summon_stats': 'cogs.summoning',
+    'reset_summons': 'cogs.summoning',
+    'cleanup': 'cogs.cleanup',
+    'cleanup_all': 'cogs.cleanup',
+    'cleanup_guild': 'cogs.cleanup',
+    'cleanup_cancel': 'cogs.cleanup',
+    'reload_messages': 'cogs.admin',
+    'force_csv_reload': 'cogs.admin',
+    'debug_messages': 'cogs.admin',
+    'force_summon_check': 'cogs.admin',
+    'stop_summoning': 'cogs.admin',
+    'beeg_status': 'cogs.status',
+    'beeg_history': 'cogs.status',
+    'dnd_status': 'cogs.status',
+}
@@ -0,0 +1,113 @@
+import heapq
+import re
+from bisect import bisect_left
+
+# Words are lowercase runs of letters/digits/apostrophes; mentions like <@123> are ignored
+MENTION_PATTERN = re.compile(r'<@!?\d+>')
+TOKEN_PATTERN = re.compile(r"[\w']+")
+
+# Partial-match fallback only looks at this many postings (lowest ids first), so it stays cheap
+FALLBACK_MAX_POSTINGS = 2000
+
+
+def tokenize(text):
+    """Split message text into lowercase search tokens"""
+    text = MENTION_PATTERN.sub(' ', text.lower())
+    return [token.strip("'") for token in TOKEN_PATTERN.findall(text) if token.strip("'")]
+
+
+def gallop(ids, target, lo):
+    """Index of the first id >= target in sorted `ids`, searching forward from `lo`"""
+    step = 1
+    hi = lo
+    while hi < len(ids) and ids[hi] < target:
+        lo = hi + 1
+        hi += step
+        step *= 2
+    return bisect_left(ids, target, lo, min(hi, len(ids)))
+
+
+class CorpusIndex:
+    """In-memory inverted index over the summoning messages"""
+
+    def __init__(self, messages=()):
+        self.by_id = {}
+        self.postings = {}  # token -> sorted list of message ids
+        self.build(messages)
+
+    def build(self, messages):
+        """(Re)build the index from a list of message dicts"""
+        by_id = {}
+        postings = {}
+        for message in messages:
+            by_id[message['id']] = message
+            for token in set(tokenize(message['text'])):
+                postings.setdefault(token, []).append(message['id'])
+        for ids in postings.values():
+            ids.sort()
+
+        # Swap in one go so lookups never see a half-built index
+        self.by_id = by_id
+        self.postings = postings
+
+    def get(self, message_id):
+        return self.by_id.get(message_id)
+
+    def _accept(self, message_ids, limit, message_type):
+        """First `limit` messages (of `message_type`, if given) from an iterable of ids"""
+        results = []
+        for message_id in message_ids:
+            message = self.by_id[message_id]
+            if message_type and message['type'] != message_type:
+                continue
+            results.append(message)
+            if len(results) >= limit:
+                break
+        return results
+
+    @staticmethod
+    def _intersect(posting_lists):
+        """Yield ids present in every list, lowest first, galloping through the longer lists"""
+        driver, *others = sorted(posting_lists, key=len)
+        positions = [0] * len(others)
+        for message_id in driver:
+            for n, ids in enumerate(others):
+                i = gallop(ids, message_id, positions[n])
+                positions[n] = i
+                if i == len(ids):
+                    return  # This list is used up, nothing further can match
+                if ids[i] != message_id:
+                    break
+            else:
+                yield message_id
+
+    def _partial_matches(self, posting_lists):
+        """Ids ranked by how many query words they contain, looking at a bounded number of postings"""
+        scores = {}
+        for seen, message_id in enumerate(heapq.merge(*posting_lists)):
+            if seen >= FALLBACK_MAX_POSTINGS:
+                break
+            scores[message_id] = scores.get(message_id, 0) + 1
+        return sorted(scores, key=lambda message_id: (-scores[message_id], message_id))
+
+    def search(self, query, limit=5, message_type=None):
+        """Messages containing every query word; falls back to best partial matches"""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        posting_lists = [self.postings.get(token, []) for token in tokens]
+
+        # Lazy intersection: stops as soon as `limit` results are found
+        results = self._accept(self._intersect(posting_lists), limit, message_type)
+        if results:
+            return results
+
+        # No message has every word - rank by how many query words each one has. Usually a word
+        # just isn't in the corpus, and then messages with all the other words are the best matches
+        present = [ids for ids in posting_lists if ids]
+        if present and len(present) < len(posting_lists):
+            results = self._accept(self._intersect(present), limit, message_type)
+            if results:
+                return results
+        return self._accept(self._partial_matches(present), limit, message_type)
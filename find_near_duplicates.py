@@ -0,0 +1,161 @@
+import csv
+import json
+import os
+import re
+import sys
+import zlib
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ This script needs NumPy: pip install numpy")
+    sys.exit(1)
+
+# Configuration
+PHRASES_FILE = 'beeg_summoning_phrases.csv'
+HAIKUS_FILE = 'beeg_summoning_haikus.csv'
+OUTPUT_FILE = 'near_duplicates.json'  # Read by the bot when loading messages from CSV
+
+SHINGLE_SIZE = 5          # Characters per shingle
+NUM_PERMUTATIONS = 128    # MinHash signature length
+LSH_BANDS = 32            # NUM_PERMUTATIONS must be LSH_BANDS * rows per band
+SIMILARITY_THRESHOLD = 0.6  # Estimated Jaccard similarity to count as a near-duplicate
+BATCH_SIZE = 512          # Messages hashed per NumPy batch (bounds memory use)
+SEED = 1337               # Fixed so repeated runs give the same clusters
+
+MENTION_PATTERN = re.compile(r'<@!?\d+>')
+
+
+def load_messages():
+    """Load phrases and haikus the same way the bot does"""
+    messages = []
+    for filename, column in ((PHRASES_FILE, 'phrase'), (HAIKUS_FILE, 'haiku')):
+        if not os.path.exists(filename):
+            print(f"⚠️ {filename} not found, skipping")
+            continue
+        with open(filename, 'r', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                messages.append({'id': int(row['number']), 'text': row[column], 'type': column})
+    return messages
+
+
+def normalize(text):
+    """Lowercase, drop mentions/punctuation and collapse whitespace"""
+    text = MENTION_PATTERN.sub(' beeg ', text.lower())
+    text = re.sub(r"[^\w\s]", ' ', text)
+    return ' '.join(text.split())
+
+
+def shingle(text):
+    """Hash every character k-gram of the normalized text to a 32-bit int"""
+    text = normalize(text)
+    if len(text) < SHINGLE_SIZE:
+        text = text.ljust(SHINGLE_SIZE)
+    grams = {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+def minhash_signatures(shingle_sets):
+    """MinHash signatures (messages x NUM_PERMUTATIONS), computed in NumPy batches"""
+    rng = np.random.default_rng(SEED)
+    # Multiply-shift hashing: h(x) = ((a * x + b) mod 2^64) >> 32, with a odd
+    a = rng.integers(1, 2 ** 63, size=NUM_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2 ** 63, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+    signatures = np.empty((len(shingle_sets), NUM_PERMUTATIONS), dtype=np.uint32)
+
+    with np.errstate(over='ignore'):  # uint64 wraparound is the point
+        for start in range(0, len(shingle_sets), BATCH_SIZE):
+            batch = shingle_sets[start:start + BATCH_SIZE]
+            lengths = np.array([len(s) for s in batch])
+            offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            flat = np.concatenate(batch)
+
+            hashed = ((flat[:, None] * a[None, :] + b[None, :]) >> np.uint64(32)).astype(np.uint32)
+            signatures[start:start + len(batch)] = np.minimum.reduceat(hashed, offsets, axis=0)
+
+    return signatures
+
+
+def candidate_pairs(signatures):
+    """LSH banding: messages that share any whole band become candidate pairs"""
+    rows = NUM_PERMUTATIONS // LSH_BANDS
+    pairs = set()
+    for band in range(LSH_BANDS):
+        band_rows = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        keys = band_rows.view(np.dtype((np.void, band_rows.dtype.itemsize * rows))).ravel()
+        _, bucket_of, bucket_sizes = np.unique(keys, return_inverse=True, return_counts=True)
+
+        # Only look at buckets holding more than one message
+        shared = np.flatnonzero(bucket_sizes[bucket_of] > 1)
+        if shared.size == 0:
+            continue
+        order = shared[np.argsort(bucket_of[shared], kind='stable')]
+        boundaries = np.flatnonzero(np.diff(bucket_of[order])) + 1
+        for members in np.split(order, boundaries):
+            members = members.tolist()
+            for i in range(len(members)):
+                for j in range(i + 1, len(members)):
+                    pairs.add((members[i], members[j]))
+    return pairs
+
+
+def find_clusters(messages):
+    """Group near-duplicate messages; returns a list of id lists (smallest id first)"""
+    shingle_sets = [shingle(m['text']) for m in messages]
+    signatures = minhash_signatures(shingle_sets)
+
+    parent = list(range(len(messages)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in candidate_pairs(signatures):
+        similarity = np.count_nonzero(signatures[i] == signatures[j]) / NUM_PERMUTATIONS
+        if similarity >= SIMILARITY_THRESHOLD:
+            parent[find(i)] = find(j)
+
+    groups = {}
+    for i in range(len(messages)):
+        groups.setdefault(find(i), []).append(messages[i]['id'])
+
+    clusters = [sorted(ids) for ids in groups.values() if len(ids) > 1]
+    clusters.sort()
+    return clusters
+
+
+def main():
+    print("🔍 Beeg Summoning Near-Duplicate Finder 🔍")
+    print("=" * 50)
+
+    messages = load_messages()
+    if not messages:
+        print("❌ No CSV files found! Make sure the files are in the same directory.")
+        return
+
+    by_id = {m['id']: m for m in messages}
+    clusters = find_clusters(messages)
+    duplicates = sum(len(c) - 1 for c in clusters)
+
+    print(f"📝 Checked {len(messages)} messages")
+    print(f"🧬 Found {len(clusters)} near-duplicate clusters ({duplicates} redundant messages)")
+
+    for cluster in clusters[:10]:
+        print("-" * 50)
+        for message_id in cluster:
+            print(f"#{message_id}: {by_id[message_id]['text'][:80]}")
+    if len(clusters) > 10:
+        print(f"... and {len(clusters) - 10} more clusters")
+
+    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+        json.dump({'threshold': SIMILARITY_THRESHOLD, 'clusters': clusters}, f, indent=2)
+
+    print(f"\n✅ Wrote clusters to {OUTPUT_FILE}")
+    print("💡 Set NEAR_DUPLICATE_MODE in config.py ('tag' or 'dedupe') and run /reload_messages to apply them.")
+
+
+if __name__ == "__main__":
+    main()
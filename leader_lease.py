@@ -0,0 +1,119 @@
+import asyncio
+import os
+import socket
+import sqlite3
+import time
+import traceback
+from contextlib import closing
+
+# Leader election configuration
+LEASE_DB_FILE = 'replica_lease.db'
+LEASE_NAME = 'summoner'
+LEASE_TTL_SECONDS = 6       # A dead leader is replaced within roughly this long
+LEASE_RENEW_SECONDS = 2     # How often the leader renews / standbys try to take over
+LEASE_SAFETY_MARGIN_SECONDS = 1  # Stop acting as leader this long before the lease runs out
+
+
+class LeaderLease:
+    """Lease-based leader election between replicas sharing a local SQLite file"""
+
+    def __init__(self, path=LEASE_DB_FILE, name=LEASE_NAME, ttl=LEASE_TTL_SECONDS, replica_id=None):
+        self.path = path
+        self.name = name
+        self.ttl = ttl
+        self.replica_id = replica_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.term = None  # Increments every time leadership changes hands
+        self.valid_until = 0.0  # monotonic deadline for acting as leader
+        self.task = None
+        self.db_ready = False
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=self.ttl, isolation_level=None)
+
+    def _init_db(self):
+        with closing(self._connect()) as db:
+            db.execute("""CREATE TABLE IF NOT EXISTS leases (
+                              name TEXT PRIMARY KEY,
+                              holder TEXT NOT NULL,
+                              term INTEGER NOT NULL,
+                              expires_at REAL NOT NULL)""")
+
+    @property
+    def is_leader(self):
+        return time.monotonic() < self.valid_until
+
+    def try_acquire(self):
+        """Acquire the lease, or renew it if we already hold it. Returns True if we're leader."""
+        if not self.db_ready:
+            self._init_db()
+            self.db_ready = True
+
+        started = time.monotonic()
+        now = time.time()
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")  # Serializes competing replicas
+            row = db.execute("SELECT holder, term, expires_at FROM leases WHERE name = ?",
+                             (self.name,)).fetchone()
+
+            if row is not None and row[0] != self.replica_id and row[2] > now:
+                db.execute("COMMIT")
+                self.valid_until = 0.0
+                return False
+
+            term = row[1] if row is not None and row[0] == self.replica_id else (row[1] + 1 if row else 1)
+            db.execute("INSERT OR REPLACE INTO leases (name, holder, term, expires_at) VALUES (?, ?, ?, ?)",
+                       (self.name, self.replica_id, term, now + self.ttl))
+            db.execute("COMMIT")
+        except sqlite3.OperationalError as e:
+            print(f"Lease check failed: {e}")
+            self.valid_until = 0.0
+            return False
+        finally:
+            db.close()
+
+        self.term = term
+        self.valid_until = started + self.ttl - LEASE_SAFETY_MARGIN_SECONDS
+        return True
+
+    def release(self):
+        """Give up the lease so a standby can take over immediately"""
+        self.valid_until = 0.0
+        with closing(self._connect()) as db:
+            db.execute("DELETE FROM leases WHERE name = ? AND holder = ?", (self.name, self.replica_id))
+
+    def start(self, on_elected, on_demoted):
+        """Start campaigning in the background"""
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.campaign(on_elected, on_demoted))
+
+    async def campaign(self, on_elected, on_demoted):
+        """Keep trying to acquire/renew the lease and report leadership changes"""
+        leading = False
+        transition = None  # Running on_elected/on_demoted task (renewals carry on meanwhile)
+        while True:
+            acquired = await asyncio.to_thread(self.try_acquire)
+
+            if acquired and not leading:
+                leading = True
+                print(f"Replica {self.replica_id} is now the leader (term {self.term})")
+                transition = asyncio.create_task(self._transition(transition, on_elected))
+            elif not acquired and leading:
+                leading = False
+                print(f"Replica {self.replica_id} lost leadership, switching to standby")
+                transition = asyncio.create_task(self._transition(transition, on_demoted))
+
+            await asyncio.sleep(LEASE_RENEW_SECONDS)
+
+    async def _transition(self, previous, callback):
+        """Run a leadership callback once the previous one has been cancelled"""
+        if previous is not None and not previous.done():
+            previous.cancel()
+            try:
+                await previous
+            except asyncio.CancelledError:
+                pass
+        try:
+            await callback()
+        except Exception:
+            traceback.print_exc()
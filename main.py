@@ -6,24 +6,23 @@ import asyncio
 import os
 from datetime import datetime, timedelta
 import csv
-from dotenv import load_dotenv
-
-load_dotenv()
-
-# Bot configuration
-DISCORD_TOKEN = os.getenv('BOT_TOKEN')
-BEEG_USER_ID = int(os.getenv('BEEG_USER_ID'))  # Replace with Beeg's actual user ID
-DESTINATION_CHANNEL_NAME = 'general'  # Channel name to send messages to
-SUMMON_INTERVAL_HOURS = 3 # How often to summon when offline
-
-# Do not disturb hours configuration (24-hour format)
-DO_NOT_DISTURB_START_HOUR = 0   # Midnight (0)
-DO_NOT_DISTURB_END_HOUR = 7     # 7 AM
-
-# File paths for data persistence
-MESSAGES_FILE = 'summoning_messages.json'
-USED_MESSAGES_FILE = 'used_messages.json'
-BOT_DATA_FILE = 'bot_data.json'
+import re
+import signal
+import sys
+import time
+import traceback
+from quiet_hours import QuietHoursEngine, QuietWindow
+from corpus_index import CorpusIndex
+from leader_lease import LeaderLease
+from presence_timeline import PresenceTimeline, HEARTBEAT_SECONDS
+from throttle import SummonThrottle
+from outbox import SummonOutbox, PRIORITY_AUTO
+from sent_index import SentMessageIndex
+from config import (
+    DISCORD_TOKEN, BEEG_USER_ID, DESTINATION_CHANNEL_NAME, SUMMON_INTERVAL_HOURS, SUMMON_SCHEDULE_MODE,
+    DO_NOT_DISTURB_START_HOUR, DO_NOT_DISTURB_END_HOUR, QUIET_HOURS_TIMEZONE, QUIET_HOURS_FILE, HA_MODE,
+    MESSAGES_FILE, USED_MESSAGES_FILE, BOT_DATA_FILE, NEAR_DUPLICATES_FILE, NEAR_DUPLICATE_MODE, COMMAND_COGS,
+)
 
 # Bot setup
 intents = discord.Intents.default()
@@ -31,55 +30,92 @@ intents.message_content = True
 intents.members = True
 intents.presences = True
 
-bot = commands.Bot(command_prefix='/', intents=intents)
+MENTION_PATTERN = re.compile(r'<@\d+>')
+
+class LazyCogBot(commands.Bot):
+    """Bot that imports each command cog the first time one of its commands is used"""
+    
+    async def get_context(self, origin, /, *, cls=commands.Context):
+        ctx = await super().get_context(origin, cls=cls)
+        if ctx.command is not None and ctx.command.name == 'help':
+            # /help has to see every command, so this is where the rest get loaded
+            for extension in sorted(set(COMMAND_COGS.values()) - set(self.extensions)):
+                await self.load_extension(extension)
+            return ctx
+        extension = COMMAND_COGS.get(ctx.invoked_with) if ctx.command is None else None
+        if extension and extension not in self.extensions:
+            await self.load_extension(extension)
+            ctx = await super().get_context(origin, cls=cls)
+        return ctx
+    
+    async def setup_hook(self):
+        # Stop cleanly on SIGTERM (systemd/docker) too, so shutdown bookkeeping in __main__ runs
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, lambda: asyncio.create_task(self.close()))
+        except (NotImplementedError, AttributeError):
+            pass  # No loop signal handlers on Windows
+        presence_heartbeat.start()
+
+bot = LazyCogBot(command_prefix='/', intents=intents)
+
+# Leader election between replicas (None = single replica, always in charge)
+leader_lease = LeaderLease() if HA_MODE else None
+
+def is_leader():
+    """Whether this replica is allowed to send messages and touch shared state"""
+    return leader_lease is None or leader_lease.is_leader
+
+# Ids of everything the bot sends, so cleanups don't have to page through channel history
+sent_index = SentMessageIndex()
+
+def record_sent(entry, message):
+    if entry.get('delete_after') is None:  # Deletes itself, nothing to clean up later
+        sent_index.record(message.channel.id, message.id)
+
+# Every outgoing message goes through the outbox (prioritized, paced, retried, persisted)
+outbox = SummonOutbox(bot, can_send=is_leader, on_sent=record_sent)
+
+# Rate limiting for manual /summon
+summon_throttle = SummonThrottle()
 
 class BeegSummoningBot:
     def __init__(self):
         self.summoning_messages = []
+        self.message_index = CorpusIndex()
+        self.duplicate_clusters = {}  # canonical id -> ids of its near-duplicates (NEAR_DUPLICATE_MODE = 'tag')
+        self.presence_timeline = PresenceTimeline()
+        self.presence_forecast = None
+        if SUMMON_SCHEDULE_MODE == 'predictive':
+            # Imported here so numpy is only loaded when predictive scheduling is on
+            try:
+                from predictive_schedule import PresenceForecast
+                self.presence_forecast = PresenceForecast(self.presence_timeline, BEEG_USER_ID)
+            except ImportError:
+                print("Predictive scheduling needs numpy (pip install numpy), falling back to fixed intervals")
         self.used_messages = set()
         self.last_message_time = None
         self.beeg_offline_since = None
         self.beeg_current_status = None
         self.summoning_task = None
-        self.load_data()
+        # Built-in window until load_data reads any extra windows from QUIET_HOURS_FILE
+        self.quiet_hours = QuietHoursEngine(self.default_quiet_windows())
+        # Corpus and state are loaded after connecting (see load_state), commands wait for this
+        self.data_loaded = asyncio.Event()
     
-    def is_do_not_disturb_time(self):
-        """Check if current time is within do-not-disturb hours"""
-        current_hour = datetime.now().hour
-        
-        if DO_NOT_DISTURB_START_HOUR <= DO_NOT_DISTURB_END_HOUR:
-            # Normal case: e.g., 22:00 to 06:00 (doesn't cross midnight)
-            return DO_NOT_DISTURB_START_HOUR <= current_hour < DO_NOT_DISTURB_END_HOUR
-        else:
-            # Crosses midnight: e.g., 22:00 to 06:00
-            return current_hour >= DO_NOT_DISTURB_START_HOUR or current_hour < DO_NOT_DISTURB_END_HOUR
-    
-    def get_next_allowed_summon_time(self):
-        """Get the next time when summoning is allowed"""
-        now = datetime.now()
-        current_hour = now.hour
-        
-        if not self.is_do_not_disturb_time():
-            return now  # Can send now
-        
-        # Calculate next allowed time
-        if DO_NOT_DISTURB_START_HOUR <= DO_NOT_DISTURB_END_HOUR:
-            # Simple case: disturbance period doesn't cross midnight
-            next_allowed = now.replace(hour=DO_NOT_DISTURB_END_HOUR, minute=0, second=0, microsecond=0)
-            if next_allowed <= now:
-                next_allowed += timedelta(days=1)
-        else:
-            # Crosses midnight
-            if current_hour >= DO_NOT_DISTURB_START_HOUR:
-                # Currently in the late night portion, wait until morning
-                next_allowed = now.replace(hour=DO_NOT_DISTURB_END_HOUR, minute=0, second=0, microsecond=0)
-                if next_allowed <= now:
-                    next_allowed += timedelta(days=1)
-            else:
-                # Currently in the early morning portion, wait until end time today
-                next_allowed = now.replace(hour=DO_NOT_DISTURB_END_HOUR, minute=0, second=0, microsecond=0)
-        
-        return next_allowed
+    def default_quiet_windows(self):
+        return [QuietWindow(DO_NOT_DISTURB_START_HOUR, DO_NOT_DISTURB_END_HOUR, timezone=QUIET_HOURS_TIMEZONE)]
+    
+    def is_do_not_disturb_time(self, when=None, target_id=BEEG_USER_ID, guild_id=None):
+        """Check if a time (default: now) is within do-not-disturb hours"""
+        return self.quiet_hours.is_quiet(when, target_id, guild_id)
+    
+    def get_next_allowed_summon_time(self, when=None, target_id=BEEG_USER_ID, guild_id=None):
+        """Get the next time (at or after `when`) when summoning is allowed"""
+        return self.quiet_hours.next_allowed(when, target_id, guild_id)
+    
+    def describe_quiet_hours(self, target_id=BEEG_USER_ID, guild_id=None):
+        """Quiet-hour windows that apply to a target, for status messages"""
+        return self.quiet_hours.describe(target_id, guild_id)
     
     def load_summoning_messages_from_csv(self):
         """Load messages from CSV files (phrases and haikus)"""
@@ -121,10 +157,37 @@ class BeegSummoningBot:
                 {'id': 5, 'text': f'Last seen three months ago\nHis profile pic still smiles\nBut <@{BEEG_USER_ID}> is absent', 'type': 'haiku'}
             ]
         
+        return self.apply_near_duplicates(messages)
+    
+    def apply_near_duplicates(self, messages):
+        """Tag or drop near-duplicate messages using clusters from find_near_duplicates.py"""
+        if NEAR_DUPLICATE_MODE == 'off' or not os.path.exists(NEAR_DUPLICATES_FILE):
+            return messages
+        
+        with open(NEAR_DUPLICATES_FILE, 'r', encoding='utf-8') as f:
+            clusters = json.load(f).get('clusters', [])
+        
+        # Every message in a cluster points at the cluster's first (lowest) id
+        canonical = {}
+        for cluster in clusters:
+            for message_id in cluster[1:]:
+                canonical[message_id] = cluster[0]
+        
+        if NEAR_DUPLICATE_MODE == 'dedupe':
+            kept = [msg for msg in messages if msg['id'] not in canonical]
+            print(f"Dropped {len(messages) - len(kept)} near-duplicate messages ({len(clusters)} clusters)")
+            return kept
+        
+        for msg in messages:
+            if msg['id'] in canonical:
+                msg['duplicate_of'] = canonical[msg['id']]
+        print(f"Tagged {len(canonical)} near-duplicate messages ({len(clusters)} clusters)")
         return messages
     
     def load_data(self):
         """Load all persistent data"""
+        self.quiet_hours = QuietHoursEngine.from_file(QUIET_HOURS_FILE, self.default_quiet_windows())
+        
         # Load summoning messages
         if os.path.exists(MESSAGES_FILE):
             with open(MESSAGES_FILE, 'r', encoding='utf-8') as f:
@@ -132,6 +195,8 @@ class BeegSummoningBot:
         else:
             self.summoning_messages = self.load_summoning_messages_from_csv()
             self.save_messages()
+        self.message_index.build(self.summoning_messages)
+        self.duplicate_clusters = self.build_duplicate_clusters(self.summoning_messages)
         
         # Load used messages
         if os.path.exists(USED_MESSAGES_FILE):
@@ -153,15 +218,20 @@ class BeegSummoningBot:
                 
                 self.beeg_current_status = bot_data.get('beeg_current_status')
     
+    def write_json(self, path, data, **kwargs):
+        """Write JSON atomically so other replicas never read a half-written file"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, **kwargs)
+        os.replace(tmp_path, path)
+    
     def save_messages(self):
         """Save summoning messages to file"""
-        with open(MESSAGES_FILE, 'w', encoding='utf-8') as f:
-            json.dump(self.summoning_messages, f, indent=2, ensure_ascii=False)
+        self.write_json(MESSAGES_FILE, self.summoning_messages, ensure_ascii=False)
     
     def save_used_messages(self):
         """Save used messages to file"""
-        with open(USED_MESSAGES_FILE, 'w') as f:
-            json.dump({'used_ids': list(self.used_messages)}, f, indent=2)
+        self.write_json(USED_MESSAGES_FILE, {'used_ids': list(self.used_messages)})
     
     def save_bot_data(self):
         """Save bot data to file"""
@@ -170,8 +240,30 @@ class BeegSummoningBot:
             'beeg_offline_since': self.beeg_offline_since.isoformat() if self.beeg_offline_since else None,
             'beeg_current_status': self.beeg_current_status
         }
-        with open(BOT_DATA_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
+        self.write_json(BOT_DATA_FILE, data)
+    
+    def set_summoning_messages(self, messages):
+        """Replace the message corpus, persist it and rebuild the search index"""
+        self.summoning_messages = messages
+        self.save_messages()
+        self.message_index.build(messages)
+        self.duplicate_clusters = self.build_duplicate_clusters(messages)
+    
+    def build_duplicate_clusters(self, messages):
+        """Map each tagged cluster's canonical id to all of its member ids"""
+        clusters = {}
+        for msg in messages:
+            if 'duplicate_of' in msg:
+                clusters.setdefault(msg['duplicate_of'], [msg['duplicate_of']]).append(msg['id'])
+        return clusters
+    
+    def get_message_by_id(self, message_id):
+        """Get a specific message by its ID and mark it as used (None if unknown)"""
+        message = self.message_index.get(message_id)
+        if message:
+            self.used_messages.add(message['id'])
+            self.save_used_messages()
+        return message
     
     def get_random_message(self):
         """Get a random unused message, reset if all used"""
@@ -186,6 +278,11 @@ class BeegSummoningBot:
         
         message = random.choice(available_messages)
         self.used_messages.add(message['id'])
+        
+        # Retire the rest of its near-duplicate cluster too, so near-copies don't follow it
+        cluster = message.get('duplicate_of', message['id'])
+        self.used_messages.update(self.duplicate_clusters.get(cluster, ()))
+        
         self.save_used_messages()
         
         return message
@@ -200,20 +297,53 @@ class BeegSummoningBot:
         for guild in bot.guilds:
             member = guild.get_member(user_id)
             if member:
-                if member.status == discord.Status.offline:
-                    return 'offline'
-                elif member.status == discord.Status.online:
-                    return 'online'
-                elif member.status == discord.Status.idle:
-                    return 'idle'
-                elif member.status == discord.Status.dnd:
-                    return 'dnd'
+                return self.member_status(member)
         return 'offline'  # Default to offline if not found
     
+    def member_status(self, member):
+        if member.status == discord.Status.online:
+            return 'online'
+        elif member.status == discord.Status.idle:
+            return 'idle'
+        elif member.status == discord.Status.dnd:
+            return 'dnd'
+        return 'offline'
+    
+    async def fetch_user_statuses(self, user_ids):
+        """Ask the gateway for just these users' presences (no member chunking), id -> status"""
+        statuses = {}
+        for guild in bot.guilds:
+            missing = [user_id for user_id in user_ids if user_id not in statuses]
+            if not missing:
+                break
+            # One small request per guild until every user is found (100 ids per request max)
+            for start in range(0, len(missing), 100):
+                try:
+                    members = await guild.query_members(user_ids=missing[start:start + 100], limit=100, presences=True)
+                except (asyncio.TimeoutError, discord.ClientException) as e:
+                    print(f"Presence query in {guild.name} failed: {e}")
+                    continue
+                for member in members:
+                    statuses[member.id] = self.member_status(member)
+        return statuses
+    
+    async def reconcile_presence(self):
+        """Catch up on presence changes missed while disconnected, via the normal status-change path"""
+        statuses = await self.fetch_user_statuses([BEEG_USER_ID])
+        if BEEG_USER_ID not in statuses:
+            return
+        
+        old_status = 'offline' if self.beeg_current_status == 'offline' else 'online'
+        new_status = 'offline' if statuses[BEEG_USER_ID] == 'offline' else 'online'
+        if old_status != new_status:
+            print("Missed a presence change while disconnected, replaying it")
+            await self.on_beeg_status_change(old_status, new_status)
+    
     async def on_beeg_status_change(self, old_status, new_status):
         """Handle Beeg's status changes"""
         print(f"Beeg status changed: {old_status} -> {new_status}")
         
+        self.presence_timeline.record(BEEG_USER_ID, new_status)
         self.beeg_current_status = new_status
         current_time = datetime.now()
         
@@ -244,28 +374,66 @@ class BeegSummoningBot:
         if self.summoning_task:
             self.summoning_task.cancel()
             self.summoning_task = None
+        
+        # Don't deliver auto summons that were still waiting in the outbox
+        outbox.discard(PRIORITY_AUTO)
     
     async def summoning_loop(self):
         """Loop that sends summoning messages while Beeg is offline"""
         try:
-            # Wait for the interval before first summon
-            await asyncio.sleep(SUMMON_INTERVAL_HOURS * 3600)
+            # First summon is one interval after going offline
+            next_summon = datetime.now() + timedelta(hours=SUMMON_INTERVAL_HOURS)
             
             while self.beeg_current_status == 'offline':
-                # Check if it's do-not-disturb time
-                if self.is_do_not_disturb_time():
-                    next_allowed = self.get_next_allowed_summon_time()
-                    wait_seconds = (next_allowed - datetime.now()).total_seconds()
-                    print(f"Do-not-disturb time active. Waiting {wait_seconds/3600:.1f} hours until {next_allowed.strftime('%H:%M')} to summon.")
-                    await asyncio.sleep(wait_seconds)
-                    continue
+                # Push the summon past any quiet window and sleep exactly until then
+                due = next_summon
+                channel = self.get_destination_channel()
+                guild_id = channel.guild.id if channel else None
+                
+                if self.presence_forecast:
+                    # Move the summon to the allowed hour in this interval when Beeg is most likely around
+                    window_end = due + timedelta(hours=SUMMON_INTERVAL_HOURS)
+                    best = self.presence_forecast.best_time(
+                        due, window_end, lambda when: not self.is_do_not_disturb_time(when, guild_id=guild_id))
+                    if best:
+                        print(f"Predictive schedule: next summon at {best.strftime('%a %H:%M')} "
+                              f"(online chance {self.presence_forecast.probability(best):.0%})")
+                        due = best
+                
+                next_summon = self.get_next_allowed_summon_time(due, guild_id=guild_id)
+                if next_summon > due:
+                    print(f"Summon due at {due.strftime('%H:%M')} falls in do-not-disturb hours, rescheduled to {next_summon.strftime('%a %H:%M')}.")
                 
-                await self.send_summoning_message()
-                await asyncio.sleep(SUMMON_INTERVAL_HOURS * 3600)
+                # Sleep on epoch timestamps (naive local times are off by an hour across DST changes),
+                # and if we still wake inside a quiet window, wait for its end rather than losing the summon
+                while True:
+                    wait_seconds = next_summon.timestamp() - time.time()
+                    if wait_seconds > 0:
+                        await asyncio.sleep(wait_seconds)
+                    if not self.is_do_not_disturb_time(guild_id=guild_id):
+                        break
+                    next_summon = self.get_next_allowed_summon_time(guild_id=guild_id)
+                
+                if self.beeg_current_status != 'offline':
+                    break
+                
+                if await self.send_summoning_message() is False:
+                    # Skipped (quiet hours for the channel's guild), retry shortly without resetting the interval
+                    next_summon = datetime.now() + timedelta(minutes=1)
+                    continue
+                next_summon = datetime.now() + timedelta(hours=SUMMON_INTERVAL_HOURS)
                 
         except asyncio.CancelledError:
             print("Summoning loop cancelled (Beeg came online or bot stopping)")
     
+    def get_destination_channel(self):
+        """Find the general channel in any guild"""
+        for guild in bot.guilds:
+            for channel in guild.text_channels:
+                if channel.name.lower() == DESTINATION_CHANNEL_NAME:
+                    return channel
+        return None
+    
     async def send_summoning_message(self):
         """Send a random summoning message to the general channel"""
         # Double-check that Beeg is still offline
@@ -275,27 +443,17 @@ class BeegSummoningBot:
             await self.stop_summoning_cycle()
             return
         
-        # Double-check do-not-disturb time
-        if self.is_do_not_disturb_time():
-            print("Attempted to send message during do-not-disturb hours, skipping")
-            return
-        
-        # Find the general channel in any guild
-        general_channel = None
-        for guild in bot.guilds:
-            for channel in guild.text_channels:
-                if channel.name.lower() == DESTINATION_CHANNEL_NAME:
-                    general_channel = channel
-                    break
-            if general_channel:
-                break
-        
+        general_channel = self.get_destination_channel()
         if not general_channel:
             print(f"Could not find #{DESTINATION_CHANNEL_NAME} channel in any guild")
             return
         
+        # Double-check do-not-disturb time (including any windows specific to this guild)
+        if self.is_do_not_disturb_time(guild_id=general_channel.guild.id):
+            print("Attempted to send message during do-not-disturb hours, skipping")
+            return False
+        
         message_data = self.get_random_message()
-        message_text = message_data['text']
         
         # Calculate how long Beeg has been offline
         offline_duration = ""
@@ -308,27 +466,44 @@ class BeegSummoningBot:
             else:
                 offline_duration = f"\n⏰ *<@{BEEG_USER_ID}> has been offline for {minutes}m*"
         
-        # Add some flair based on message type
-        if message_data['type'] == 'haiku':
-            formatted_message = f"🎋 **Auto-Haiku #{message_data['id']}** 🎋\n```\n{message_text}\n```"
-        else:
-            formatted_message = f"📢 **Auto-Summon #{message_data['id']}** 📢\n{message_text}"
+        formatted_message = self.format_summoning_message(message_data)
         
-        try:
-            await general_channel.send(formatted_message)
-            self.last_message_time = datetime.now()
-            self.save_bot_data()
-            print(f"Sent summoning message #{message_data['id']} to #{general_channel.name}")
-        except discord.errors.Forbidden:
-            print(f"No permission to send messages in #{general_channel.name}")
-        except Exception as e:
-            print(f"Error sending message: {e}")
+        sent_message = await outbox.send(general_channel, formatted_message, PRIORITY_AUTO)
+        if sent_message is None:
+            print(f"Summoning message #{message_data['id']} was not delivered to #{general_channel.name}")
+            return
+        
+        self.last_message_time = datetime.now()
+        self.save_bot_data()
+        print(f"Sent summoning message #{message_data['id']} to #{general_channel.name}")
+    
+    def format_summoning_message(self, message_data, manual=False, mention=None):
+        """Add some flair based on message type (and swap in `mention` for any mentions)"""
+        message_text = message_data['text']
+        if mention:
+            # This handles cases where CSV has Beeg's ID but we want to summon someone else
+            message_text = MENTION_PATTERN.sub(mention, message_text)
+        
+        if manual:
+            if message_data['type'] == 'haiku':
+                return (f"🎋 **MANUAL SUMMONING HAIKU #{message_data['id']}** 🎋\n"
+                        f"```\n{message_text}\n```")
+            return (f"📢 **MANUAL SUMMONING #{message_data['id']}** 📢\n"
+                    f"{message_text}")
+        
+        if message_data['type'] == 'haiku':
+            return f"🎋 **Auto-Haiku #{message_data['id']}** 🎋\n```\n{message_text}\n```"
+        return f"📢 **Auto-Summon #{message_data['id']}** 📢\n{message_text}"
     
     async def check_initial_beeg_status(self):
         """Check Beeg's status when bot starts up"""
         current_status = self.get_user_status(BEEG_USER_ID)
         print(f"Initial Beeg status: {current_status}")
         
+        # Record the status in the timeline (no-op if it hasn't changed since the last transition)
+        if current_status != 'unknown':
+            self.presence_timeline.record(BEEG_USER_ID, 'offline' if current_status == 'offline' else 'online')
+        
         # If we don't have a previous status, set it
         if self.beeg_current_status is None:
             self.beeg_current_status = current_status
@@ -352,392 +527,133 @@ class BeegSummoningBot:
 # Initialize the summoning bot
 summoning_bot = BeegSummoningBot()
 
+# Shared with the cogs
+bot.summoning_bot = summoning_bot
+bot.outbox = outbox
+bot.sent_index = sent_index
+bot.summon_throttle = summon_throttle
+
+async def load_state():
+    """Load the corpus, bot state and queued sends in a worker thread (keeps the gateway responsive)
+
+    Returns False (after shutting the bot down) if the state can't be loaded, rather than
+    leaving commands waiting forever for data that will never arrive.
+    """
+    summoning_bot.data_loaded.clear()
+    try:
+        await asyncio.to_thread(summoning_bot.load_data)
+    except Exception:
+        traceback.print_exc()
+        print("❌ Could not load the bot's state (corrupted JSON file?), shutting down")
+        await bot.close()
+        return False
+    outbox.clear()
+    await asyncio.to_thread(outbox.load)
+    await asyncio.to_thread(sent_index.load)
+    # Presence wasn't observed while no leader was running (from the last heartbeat on)
+    summoning_bot.presence_timeline.mark_gap(BEEG_USER_ID)
+    summoning_bot.data_loaded.set()
+    print(f'Do-not-disturb hours: {summoning_bot.describe_quiet_hours()}')
+    return True
+
 @bot.event
 async def on_ready():
     print(f'Current time: {datetime.now()}')
     print(f'{bot.user} has connected to Discord!')
     print(f'Bot is in {len(bot.guilds)} guilds')
-    print(f'Do-not-disturb hours: {DO_NOT_DISTURB_START_HOUR:02d}:00 to {DO_NOT_DISTURB_END_HOUR:02d}:00')
+    
+    if leader_lease:
+        # Standby until we win the lease; the leader does everything below
+        print(f'HA mode: replica {leader_lease.replica_id} campaigning for leadership')
+        leader_lease.start(on_elected=become_leader, on_demoted=become_standby)
+        if is_leader() and summoning_bot.data_loaded.is_set():
+            await summoning_bot.reconcile_presence()  # Reconnected while leading
+        return
+    
+    # on_ready also fires after reconnects - only load state the first time
+    if summoning_bot.data_loaded.is_set():
+        await summoning_bot.reconcile_presence()
+        return
+    
+    if not await load_state():
+        return
+    print(f'Loaded {len(summoning_bot.summoning_messages)} summoning messages')
+    
+    # Start delivering queued messages (including any left over from before a restart)
+    outbox.start()
     
     # Check Beeg's initial status and start summoning if needed
     await summoning_bot.check_initial_beeg_status()
 
 @bot.event
-async def on_presence_update(before, after):
-    """Detect when Beeg's status changes"""
-    if after.id == BEEG_USER_ID:
-        old_status = 'offline' if before.status == discord.Status.offline else 'online'
-        new_status = 'offline' if after.status == discord.Status.offline else 'online'
-        
-        # Only trigger if status actually changed
-        if old_status != new_status:
-            await summoning_bot.on_beeg_status_change(old_status, new_status)
+async def on_resumed():
+    """Presence updates aren't guaranteed to be replayed after a resume, so re-check Beeg"""
+    if is_leader() and summoning_bot.data_loaded.is_set():
+        await summoning_bot.reconcile_presence()
 
-# Helper function for cleanup commands
-async def delete_bot_messages_except_latest(channel, limit=None):
-    """Delete all bot messages except the most recent one"""
-    bot_messages = []
-    
-    # Collect bot messages
-    async for message in channel.history(limit=limit):
-        if message.author == bot.user:
-            bot_messages.append(message)
-    
-    # Sort by timestamp (newest first) and skip the first one
-    bot_messages.sort(key=lambda m: m.created_at, reverse=True)
-    messages_to_delete = bot_messages[1:]  # Skip the newest message
-    
-    deleted_count = 0
-    for message in messages_to_delete:
-        try:
-            await message.delete()
-            deleted_count += 1
-            await asyncio.sleep(0.5)  # Rate limiting
-        except discord.errors.NotFound:
-            pass  # Message already deleted
-        except Exception as e:
-            print(f"Error deleting message: {e}")
-    
-    return deleted_count
-
-# Fix 1: Update the manual summon command (replace the existing command)
-@bot.command(name='summon')
-async def summon_command(ctx, user: discord.Member = None):
-    """Manual summon command: /summon @username"""
-    if user is None:
-        # Default to Beeg if no user specified
-        user = bot.get_user(BEEG_USER_ID)
-        if user is None:
-            await ctx.send("❌ Could not find the target user!")
-            return
-    
-    # Check if it's do-not-disturb time for automatic summons
-    if summoning_bot.is_do_not_disturb_time():
-        next_allowed = summoning_bot.get_next_allowed_summon_time()
-        await ctx.send(f"🌙 **Do-not-disturb time active!**\n"
-                      f"⏰ Quiet hours: {DO_NOT_DISTURB_START_HOUR:02d}:00 - {DO_NOT_DISTURB_END_HOUR:02d}:00\n"
-                      f"🔔 Next summon allowed at: {next_allowed.strftime('%H:%M')}\n"
-                      f"💡 *Manual summons still work during quiet hours*")
-    
-    # Get a random summoning message
-    message_data = summoning_bot.get_random_message()
-    message_text = message_data['text']
-    
-    # Replace any existing mentions in the message with the target user
-    # This handles cases where CSV has Beeg's ID but we want to summon someone else
-    import re
-    mention_pattern = r'<@\d+>'
-    message_text = re.sub(mention_pattern, user.mention, message_text)
-    
-    # Format the message
-    if message_data['type'] == 'haiku':
-        formatted_message = (f"🎋 **MANUAL SUMMONING HAIKU #{message_data['id']}** 🎋\n"
-                           f"```\n{message_text}\n```")
-    else:
-        formatted_message = (f"📢 **MANUAL SUMMONING #{message_data['id']}** 📢\n"
-                           f"{message_text}")
-    
-    await ctx.send(formatted_message)
-    print(f"Manual summon used by {ctx.author} targeting {user.display_name}")
+@tasks.loop(seconds=HEARTBEAT_SECONDS)
+async def presence_heartbeat():
+    """Note that Beeg's presence is being observed, so after a crash only the last minute is lost"""
+    if is_leader() and summoning_bot.data_loaded.is_set():
+        await asyncio.to_thread(summoning_bot.presence_timeline.heartbeat, BEEG_USER_ID)
 
-@bot.command(name='cleanup')
-async def cleanup_bot_messages(ctx, limit: int = 10):
-    """Delete the bot's recent messages except the latest one (default: last 10 messages)"""
-    if limit > 50:
-        await ctx.send("❌ Limit too high! Maximum 50 messages at once.")
+async def become_leader():
+    """Take over from a previous leader: pick up its state, queued sends and summoning cycle"""
+    if not await load_state():
         return
-    
-    try:
-        deleted_count = await delete_bot_messages_except_latest(ctx.channel, limit=100)
-        
-        if deleted_count > 0:
-            # Send confirmation (this will auto-delete after 5 seconds)
-            confirmation = await ctx.send(f"🗑️ Deleted {deleted_count} bot messages (kept the latest one)!")
-            await asyncio.sleep(5)
-            await confirmation.delete()
-        else:
-            await ctx.send("ℹ️ No bot messages found to delete.")
-        
-        # Delete the user's command message
-        try:
-            await ctx.message.delete()
-        except discord.errors.NotFound:
-            pass  # Message already deleted
-        except Exception as e:
-            print(f"Error deleting command message: {e}")
-            
-    except discord.errors.Forbidden:
-        await ctx.send("❌ Bot doesn't have permission to delete messages in this channel.")
-    except Exception as e:
-        await ctx.send(f"❌ Error deleting messages: {e}")
-
-@bot.command(name='cleanup_all')
-async def cleanup_all_bot_messages(ctx):
-    """Delete ALL bot messages except the latest one in this channel (use with caution!)"""
-    try:
-        # Confirm before mass deletion
-        confirm_msg = await ctx.send("⚠️ This will delete ALL bot messages except the latest one in this channel. React with ✅ to confirm (30 second timeout)")
-        await confirm_msg.add_reaction("✅")
-        
-        def check(reaction, user):
-            return user == ctx.author and str(reaction.emoji) == "✅" and reaction.message.id == confirm_msg.id
-        
-        try:
-            await bot.wait_for('reaction_add', timeout=30.0, check=check)
-        except asyncio.TimeoutError:
-            await confirm_msg.edit(content="❌ Cleanup cancelled (timeout)")
-            return
-        
-        await confirm_msg.delete()
-        
-        # Delete all bot messages except the latest one
-        deleted_count = await delete_bot_messages_except_latest(ctx.channel)
-        
-        # Send final confirmation
-        final_msg = await ctx.send(f"🗑️ Cleanup complete! Deleted {deleted_count} bot messages (kept the latest one).")
-        await asyncio.sleep(5)
-        await final_msg.delete()
-        
-        # Delete the user's command message
-        try:
-            await ctx.message.delete()
-        except discord.errors.NotFound:
-            pass  # Message already deleted
-        except Exception as e:
-            print(f"Error deleting command message: {e}")
-        
-    except discord.errors.Forbidden:
-        await ctx.send("❌ Bot doesn't have permission to delete messages in this channel.")
-    except Exception as e:
-        await ctx.send(f"❌ Error during cleanup: {e}")
-
-# Fix 2: Add command to reload messages from CSV (add this new command)
-@bot.command(name='reload_messages')
-@commands.has_permissions(administrator=True)
-async def reload_messages(ctx):
-    """Reload summoning messages from CSV files (admin only)"""
-    try:
-        # Force reload from CSV
-        summoning_bot.summoning_messages = summoning_bot.load_summoning_messages_from_csv()
-        summoning_bot.save_messages()  # Save the new messages to JSON
-        summoning_bot.used_messages.clear()  # Reset used messages since we have new content
-        summoning_bot.save_used_messages()
-        
-        total_messages = len(summoning_bot.summoning_messages)
-        phrases = len([m for m in summoning_bot.summoning_messages if m['type'] == 'phrase'])
-        haikus = len([m for m in summoning_bot.summoning_messages if m['type'] == 'haiku'])
-        
-        await ctx.send(f"✅ **Messages reloaded from CSV files!**\n"
-                      f"📝 Total: {total_messages} ({phrases} phrases, {haikus} haikus)\n"
-                      f"🔄 Used message list reset")
-        
-        # Delete the user's command message
-        try:
-            await ctx.message.delete()
-        except discord.errors.NotFound:
-            pass
-        
-    except Exception as e:
-        await ctx.send(f"❌ **Error reloading messages:** {e}")
+    outbox.start()
+    await summoning_bot.check_initial_beeg_status()
 
-# Fix 3: Add command to delete the JSON file and force CSV reload (add this new command)
-@bot.command(name='force_csv_reload')
-@commands.has_permissions(administrator=True)
-async def force_csv_reload(ctx):
-    """Delete JSON cache and force reload from CSV files (admin only)"""
-    try:
-        # Delete the JSON files to force fresh load
-        if os.path.exists(MESSAGES_FILE):
-            os.remove(MESSAGES_FILE)
-        if os.path.exists(USED_MESSAGES_FILE):
-            os.remove(USED_MESSAGES_FILE)
-        
-        # Reload everything
-        summoning_bot.summoning_messages = summoning_bot.load_summoning_messages_from_csv()
-        summoning_bot.save_messages()
-        summoning_bot.used_messages.clear()
-        summoning_bot.save_used_messages()
-        
-        total_messages = len(summoning_bot.summoning_messages)
-        phrases = len([m for m in summoning_bot.summoning_messages if m['type'] == 'phrase'])
-        haikus = len([m for m in summoning_bot.summoning_messages if m['type'] == 'haiku'])
-        
-        await ctx.send(f"✅ **Forced fresh reload from CSV files!**\n"
-                      f"📝 Total: {total_messages} ({phrases} phrases, {haikus} haikus)\n"
-                      f"🗑️ Deleted old cache files\n"
-                      f"🔄 Used message list reset")
-        
-        # Delete the user's command message
-        try:
-            await ctx.message.delete()
-        except discord.errors.NotFound:
-            pass
-        
-    except Exception as e:
-        await ctx.send(f"❌ **Error during force reload:** {e}")
+async def become_standby():
+    """Stop summoning and sending (without touching shared state) after losing the lease"""
+    if summoning_bot.summoning_task:
+        summoning_bot.summoning_task.cancel()
+        summoning_bot.summoning_task = None
+    await outbox.stop()
 
-# Fix 4: Add debug command to see what messages are loaded (add this new command)
-@bot.command(name='debug_messages')
-@commands.has_permissions(administrator=True)
-async def debug_messages(ctx):
-    """Show sample of loaded messages for debugging (admin only)"""
-    if not summoning_bot.summoning_messages:
-        await ctx.send("❌ No messages loaded!")
-        return
-    
-    # Show first 3 messages as examples
-    sample_messages = summoning_bot.summoning_messages[:3]
-    debug_text = "🔍 **Debug: Sample loaded messages**\n"
-    
-    for msg in sample_messages:
-        debug_text += f"\n**ID {msg['id']} ({msg['type']}):**\n"
-        debug_text += f"```{msg['text'][:100]}{'...' if len(msg['text']) > 100 else ''}```"
-    
-    await ctx.send(debug_text)
+class NotLeader(commands.CheckFailure):
+    """Raised for commands received by a standby replica"""
 
-@bot.command(name='summon_stats')
-async def summon_stats(ctx):
-    """Show summoning statistics"""
-    total_messages = len(summoning_bot.summoning_messages)
-    used_messages = len(summoning_bot.used_messages)
-    remaining = total_messages - used_messages
-    
-    phrases = len([m for m in summoning_bot.summoning_messages if m['type'] == 'phrase'])
-    haikus = len([m for m in summoning_bot.summoning_messages if m['type'] == 'haiku'])
-    
-    last_time = summoning_bot.last_message_time
-    last_time_str = last_time.strftime("%Y-%m-%d %H:%M:%S") if last_time else "Never"
-    
-    # Do-not-disturb status
-    dnd_status = "🌙 ACTIVE" if summoning_bot.is_do_not_disturb_time() else "☀️ INACTIVE"
-    
-    stats_message = (f"📊 **Beeg Summoning Stats** 📊\n"
-                    f"📝 Total messages: {total_messages} ({phrases} phrases, {haikus} haikus)\n"
-                    f"✅ Used messages: {used_messages}\n"
-                    f"⏳ Remaining: {remaining}\n"
-                    f"🕐 Last auto-summon: {last_time_str}\n"
-                    f"🔕 Do-not-disturb ({DO_NOT_DISTURB_START_HOUR:02d}:00-{DO_NOT_DISTURB_END_HOUR:02d}:00): {dnd_status}")
-    
-    await ctx.send(stats_message)
+@bot.check
+async def leader_only(ctx):
+    """Only the leader replica answers commands (every replica receives them)"""
+    if not is_leader():
+        raise NotLeader()
+    # Commands issued right after connecting wait for the deferred state load
+    await summoning_bot.data_loaded.wait()
+    return True
 
-@bot.command(name='reset_summons')
-@commands.has_permissions(administrator=True)
-async def reset_summons(ctx):
-    """Reset the used messages list (admin only)"""
-    summoning_bot.used_messages.clear()
-    summoning_bot.save_used_messages()
-    await ctx.send("🔄 **Summoning messages reset!** All messages are now available again.")
-    
-    # Delete the user's command message
-    try:
-        await ctx.message.delete()
-    except discord.errors.NotFound:
-        pass
+@bot.event
+async def on_command_error(ctx, error):
+    if isinstance(error, NotLeader):
+        return  # The leader replica handles it
+    print(f'Ignoring exception in command {ctx.command}:', file=sys.stderr)
+    traceback.print_exception(type(error), error, error.__traceback__, file=sys.stderr)
 
-@bot.command(name='beeg_status')
-async def beeg_status(ctx):
-    """Check if Beeg is online or offline"""
-    user = bot.get_user(BEEG_USER_ID)
-    if user is None:
-        await ctx.send("❌ Could not find Beeg!")
-        return
+@bot.event
+async def on_presence_update(before, after):
+    """Detect when Beeg's status changes"""
+    if not is_leader() or not summoning_bot.data_loaded.is_set():
+        return  # Reconciled by check_initial_beeg_status once state is loaded / on takeover
     
-    current_status = summoning_bot.get_user_status(BEEG_USER_ID)
-    
-    # Status emoji and text
-    if current_status == 'offline':
-        status_emoji = "💤"
-        status_text = "OFFLINE (prime summoning time!)"
-    elif current_status == 'online':
-        status_emoji = "✅"
-        status_text = "ONLINE (summoning successful!)"
-    elif current_status == 'idle':
-        status_emoji = "🌙"
-        status_text = "IDLE (maybe summoning will work?)"
-    elif current_status == 'dnd':
-        status_emoji = "🔴"
-        status_text = "DO NOT DISTURB (summoning may anger the Beeg)"
-    else:
-        status_emoji = "❓"
-        status_text = "UNKNOWN (Schrödinger's Beeg)"
-    
-    # Add offline duration if applicable
-    offline_info = ""
-    if current_status == 'offline' and summoning_bot.beeg_offline_since:
-        delta = datetime.now() - summoning_bot.beeg_offline_since
-        hours = int(delta.total_seconds() // 3600)
-        minutes = int((delta.total_seconds() % 3600) // 60)
-        if hours > 0:
-            offline_info = f"\n⏰ Offline for: {hours}h {minutes}m"
-        else:
-            offline_info = f"\n⏰ Offline for: {minutes}m"
+    if after.id == BEEG_USER_ID:
+        old_status = 'offline' if before.status == discord.Status.offline else 'online'
+        new_status = 'offline' if after.status == discord.Status.offline else 'online'
         
-        # Add summoning status
-        if summoning_bot.summoning_task and not summoning_bot.summoning_task.done():
-            offline_info += "\n🔮 Auto-summoning: ACTIVE"
-        else:
-            offline_info += "\n🔮 Auto-summoning: INACTIVE"
-    
-    # Add do-not-disturb status
-    dnd_info = ""
-    if summoning_bot.is_do_not_disturb_time():
-        next_allowed = summoning_bot.get_next_allowed_summon_time()
-        dnd_info = f"\n🌙 Do-not-disturb active until {next_allowed.strftime('%H:%M')}"
-    
-    await ctx.send(f"{status_emoji} **Beeg is currently: {status_text}**{offline_info}{dnd_info}")
-
-@bot.command(name='force_summon_check')
-@commands.has_permissions(administrator=True)
-async def force_summon_check(ctx):
-    """Force check Beeg's status and restart summoning if needed (admin only)"""
-    old_status = summoning_bot.beeg_current_status
-    await summoning_bot.check_initial_beeg_status()
-    new_status = summoning_bot.beeg_current_status
-    
-    await ctx.send(f"🔍 **Status check complete!**\n"
-                   f"Previous: {old_status}\n"
-                   f"Current: {new_status}\n"
-                   f"Summoning active: {summoning_bot.summoning_task is not None and not summoning_bot.summoning_task.done()}")
-    
-    # Delete the user's command message
-    try:
-        await ctx.message.delete()
-    except discord.errors.NotFound:
-        pass
+        # Only trigger if status actually changed
+        if old_status != new_status:
+            await summoning_bot.on_beeg_status_change(old_status, new_status)
 
-@bot.command(name='stop_summoning')
-@commands.has_permissions(administrator=True)
-async def stop_summoning(ctx):
-    """Stop automatic summoning (admin only)"""
-    await summoning_bot.stop_summoning_cycle()
-    await ctx.send("🛑 **Automatic summoning stopped!** Beeg is safe... for now.")
-    
-    # Delete the user's command message
-    try:
-        await ctx.message.delete()
-    except discord.errors.NotFound:
-        pass
+@bot.event
+async def on_raw_message_delete(payload):
+    """Keep the sent message index in step with deletions (by cleanups, users or auto-delete)"""
+    if is_leader() and summoning_bot.data_loaded.is_set():
+        sent_index.forget(payload.channel_id, [payload.message_id])
 
-@bot.command(name='dnd_status')
-async def dnd_status(ctx):
-    """Check current do-not-disturb status"""
-    current_time = datetime.now()
-    is_dnd = summoning_bot.is_do_not_disturb_time()
-    
-    if is_dnd:
-        next_allowed = summoning_bot.get_next_allowed_summon_time()
-        time_remaining = next_allowed - current_time
-        hours = int(time_remaining.total_seconds() // 3600)
-        minutes = int((time_remaining.total_seconds() % 3600) // 60)
-        
-        await ctx.send(f"🌙 **Do-not-disturb is ACTIVE**\n"
-                      f"⏰ Quiet hours: {DO_NOT_DISTURB_START_HOUR:02d}:00 - {DO_NOT_DISTURB_END_HOUR:02d}:00\n"
-                      f"🔔 Next summon allowed: {next_allowed.strftime('%H:%M')}\n"
-                      f"⏳ Time remaining: {hours}h {minutes}m")
-    else:
-        await ctx.send(f"☀️ **Do-not-disturb is INACTIVE**\n"
-                      f"⏰ Quiet hours: {DO_NOT_DISTURB_START_HOUR:02d}:00 - {DO_NOT_DISTURB_END_HOUR:02d}:00\n"
-                      f"✅ Auto-summoning is allowed right now!")
+@bot.event
+async def on_raw_bulk_message_delete(payload):
+    if is_leader() and summoning_bot.data_loaded.is_set():
+        sent_index.forget(payload.channel_id, payload.message_ids)
 
 if __name__ == "__main__":
     # Make sure to replace 'YOUR_BOT_TOKEN_HERE' with your actual bot token
@@ -745,4 +661,9 @@ if __name__ == "__main__":
         print("❌ Please set your Discord bot token in the DISCORD_TOKEN variable!")
         print("You can get a token by creating a bot at https://discord.com/developers/applications")
     else:
-        bot.run(DISCORD_TOKEN)
\ No newline at end of file
+        bot.run(DISCORD_TOKEN)
+        if is_leader() and summoning_bot.data_loaded.is_set():
+            # Last moment Beeg's presence was observed; the next start turns the downtime into a gap
+            summoning_bot.presence_timeline.heartbeat(BEEG_USER_ID)
+        if leader_lease:
+            leader_lease.release()  # Let a standby take over right away
\ No newline at end of file
@@ -0,0 +1,285 @@
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import random
+import time
+import traceback
+from collections import deque
+
+import aiohttp
+import discord
+
+# Outbox configuration
+OUTBOX_FILE = 'outbox.json'
+
+# Lower number = sent first
+PRIORITY_MANUAL = 0        # /summon and other user-requested summons
+PRIORITY_AUTO = 1          # Automatic summons from the summoning loop
+PRIORITY_HOUSEKEEPING = 2  # Command replies, confirmations, status messages
+
+# Per-channel pacing (Discord allows roughly 5 messages per 5 seconds per channel)
+CHANNEL_RATE_LIMIT = 5
+CHANNEL_RATE_WINDOW_SECONDS = 5.0
+
+# Retry behaviour for failed sends: back off up to 5 minutes between attempts and keep
+# trying for 6 hours after the first failure, so a Discord outage doesn't lose summons
+RETRY_BASE_DELAY_SECONDS = 2.0
+RETRY_MAX_DELAY_SECONDS = 300.0
+RETRY_GIVE_UP_SECONDS = 6 * 3600
+
+
+class SummonOutbox:
+    """Durable priority queue that paces every message the bot sends"""
+
+    def __init__(self, client, path=OUTBOX_FILE, can_send=None, on_sent=None):
+        self.client = client
+        self.path = path
+        self.can_send = can_send  # Optional gate checked before every send (e.g. still the leader)
+        self.on_sent = on_sent  # Optional callback(entry, message) after every successful send
+        self.pending = []  # heap of (priority, seq, entry)
+        self.waiters = {}  # entry id -> future resolved with the sent discord.Message
+        self.recent_sends = {}  # channel id -> deque of monotonic send times
+        self.in_flight = None  # entry currently being sent, kept on disk until it completes
+        self.counter = itertools.count()
+        self.wakeup = asyncio.Event()
+        self.worker_task = None
+
+    def load(self):
+        """Load pending sends left over from a previous run (call before start)"""
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f).get('pending', [])
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"Could not read {self.path}, starting with an empty outbox: {e}")
+            return
+
+        for entry in entries:
+            self._push(entry)
+
+        if entries:
+            print(f"Outbox restored {len(entries)} pending message(s) from {self.path}")
+
+    def clear(self):
+        """Forget everything queued in memory (before re-loading from disk, e.g. on takeover)"""
+        for _, _, entry in self.pending:
+            self._resolve(entry, None)
+        self.pending = []
+
+    def save(self):
+        """Persist pending sends so they survive a restart"""
+        queued = [entry for _, _, entry in sorted(self.pending, key=lambda item: item[:2])]
+        if self.in_flight:
+            queued.insert(0, self.in_flight)
+        entries = [entry for entry in queued if entry['persist']]
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'pending': entries}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def _push(self, entry):
+        seq = next(self.counter)
+        entry.setdefault('id', f"{int(time.time() * 1000)}-{seq}")
+        heapq.heappush(self.pending, (entry['priority'], seq, entry))
+
+    def start(self):
+        """Start the background sender (call once the client is connected)"""
+        if self.worker_task is None or self.worker_task.done():
+            self.worker_task = asyncio.create_task(self.worker())
+
+    async def stop(self):
+        """Stop the background sender, leaving pending sends on disk"""
+        if self.worker_task:
+            self.worker_task.cancel()
+            try:
+                await self.worker_task
+            except asyncio.CancelledError:
+                pass
+            self.worker_task = None
+
+    def enqueue(self, channel, content, priority=PRIORITY_HOUSEKEEPING, persist=True, delete_after=None):
+        """Queue a message for a channel and return a future for the sent message"""
+        entry = {
+            'channel_id': channel.id,
+            'content': content,
+            'priority': priority,
+            'attempts': 0,
+            'not_before': 0.0,
+            'persist': persist,
+            'delete_after': delete_after,
+        }
+        self._push(entry)
+
+        future = asyncio.get_running_loop().create_future()
+        self.waiters[entry['id']] = future
+
+        if persist:
+            self.save()
+        self.wakeup.set()
+        return future
+
+    async def send(self, channel, content, priority=PRIORITY_HOUSEKEEPING, persist=True, delete_after=None):
+        """Queue a message and wait until it has been sent (None if it was dropped)"""
+        return await self.enqueue(channel, content, priority, persist, delete_after)
+
+    def discard(self, priority):
+        """Drop every pending send with the given priority (e.g. auto summons once Beeg is back)"""
+        kept = []
+        dropped = 0
+        for item in self.pending:
+            entry = item[2]
+            if entry['priority'] == priority:
+                self._resolve(entry, None)
+                dropped += 1
+            else:
+                kept.append(item)
+
+        if dropped:
+            heapq.heapify(kept)
+            self.pending = kept
+            self.save()
+            print(f"Outbox discarded {dropped} pending message(s) with priority {priority}")
+        return dropped
+
+    def _resolve(self, entry, message):
+        future = self.waiters.pop(entry['id'], None)
+        if future and not future.done():
+            future.set_result(message)
+
+    def _channel_delay(self, channel_id, now):
+        """Seconds until the channel has rate-limit budget again (0 if available now)"""
+        sends = self.recent_sends.get(channel_id)
+        if not sends:
+            return 0.0
+
+        while sends and now - sends[0] >= CHANNEL_RATE_WINDOW_SECONDS:
+            sends.popleft()
+
+        if len(sends) < CHANNEL_RATE_LIMIT:
+            return 0.0
+        return CHANNEL_RATE_WINDOW_SECONDS - (now - sends[0])
+
+    def _next_ready(self):
+        """Pop the highest-priority entry that may be sent now, or return the time to wait"""
+        now = time.monotonic()
+        wall_now = time.time()
+        skipped = []
+        ready = None
+        wait = None
+
+        while self.pending:
+            item = heapq.heappop(self.pending)
+            entry = item[2]
+            delay = max(entry['not_before'] - wall_now,
+                        self._channel_delay(entry['channel_id'], now))
+            if delay <= 0:
+                ready = entry
+                break
+            skipped.append(item)
+            wait = delay if wait is None else min(wait, delay)
+
+        for item in skipped:
+            heapq.heappush(self.pending, item)
+
+        return ready, wait
+
+    async def worker(self):
+        """Send queued messages in priority order, respecting per-channel budgets"""
+        try:
+            while True:
+                self.wakeup.clear()
+                entry, wait = self._next_ready()
+
+                if entry is None:
+                    try:
+                        await asyncio.wait_for(self.wakeup.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                if self.can_send and not self.can_send():
+                    # Not allowed to send right now - put it back and check again shortly
+                    heapq.heappush(self.pending, (entry['priority'], next(self.counter), entry))
+                    await asyncio.sleep(1)
+                    continue
+
+                try:
+                    await self._deliver(entry)
+                except Exception:
+                    # A bug handling one entry must never stop the queue (or leave its sender waiting)
+                    traceback.print_exc()
+                    self._finish(entry, None)
+        except asyncio.CancelledError:
+            print("Outbox worker stopped")
+            raise
+
+    async def _deliver(self, entry):
+        self.in_flight = entry
+        try:
+            await self._send_entry(entry)
+        finally:
+            self.in_flight = None
+
+    async def _send_entry(self, entry):
+        channel = self.client.get_channel(entry['channel_id'])
+        if channel is None:
+            # Not in the cache yet (still connecting) - try again shortly
+            self._retry(entry, "channel not available")
+            return
+
+        self.recent_sends.setdefault(entry['channel_id'], deque()).append(time.monotonic())
+
+        try:
+            message = await channel.send(entry['content'], delete_after=entry.get('delete_after'))
+        except (discord.errors.Forbidden, discord.errors.NotFound) as e:
+            print(f"Outbox dropping message for #{getattr(channel, 'name', channel.id)}: {e}")
+            self._finish(entry, None)
+        except discord.errors.HTTPException as e:
+            if e.status >= 500 or e.status == 429:
+                self._retry(entry, e)
+            else:
+                # Other 4xx errors (e.g. content over 2000 characters) fail the same way every time
+                print(f"Outbox dropping message for #{getattr(channel, 'name', channel.id)}: {e}")
+                self._finish(entry, None)
+        except (OSError, asyncio.TimeoutError, aiohttp.ClientError) as e:
+            self._retry(entry, e)
+        except Exception as e:
+            print(f"Outbox dropping message {entry['id']} after an unexpected error: {e!r}")
+            self._finish(entry, None)
+        else:
+            if self.on_sent:
+                try:
+                    self.on_sent(entry, message)
+                except Exception:
+                    traceback.print_exc()  # The message did go out, so don't send it again
+            self._finish(entry, message)
+
+    def _finish(self, entry, message):
+        self.in_flight = None
+        self._resolve(entry, message)
+        if entry['persist']:
+            self.save()
+
+    def _retry(self, entry, reason):
+        self.in_flight = None
+        now = time.time()
+        entry['attempts'] += 1
+        entry.setdefault('first_failed_at', now)
+        if now - entry['first_failed_at'] >= RETRY_GIVE_UP_SECONDS:
+            print(f"Outbox giving up on message {entry['id']} after {entry['attempts']} attempts: {reason}")
+            self._finish(entry, None)
+            return
+
+        exponent = min(entry['attempts'] - 1, 16)  # Far past the cap already, keeps the numbers small
+        delay = min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * (2 ** exponent))
+        delay *= random.uniform(0.5, 1.0)  # Jitter so retries don't line up
+        entry['not_before'] = now + delay
+        print(f"Outbox send failed ({reason}), retrying in {delay:.1f}s (attempt {entry['attempts']})")
+
+        self._push(entry)
+        if entry['persist']:
+            self.save()
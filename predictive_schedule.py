@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Predictive scheduling configuration
+HISTORY_WEEKS = 8                 # How much presence history feeds the histogram
+REFRESH_SECONDS = 3600            # Rebuild the histogram at most this often
+PRIOR_HOURS = 2.0                 # Smoothing: pretend each hour-of-week slot has this much 50/50 history
+HOURS_PER_WEEK = 168
+
+
+def hour_of_week(when):
+    """0 = Monday 00:00-01:00 local time, 167 = Sunday 23:00-24:00"""
+    return when.weekday() * 24 + when.hour
+
+
+class PresenceForecast:
+    """Hour-of-week online probabilities built from the presence timeline"""
+
+    def __init__(self, timeline, user_id, weeks=HISTORY_WEEKS):
+        self.timeline = timeline
+        self.user_id = user_id
+        self.weeks = weeks
+        self.probabilities = np.full(HOURS_PER_WEEK, 0.5)
+        self.built_at = None
+
+    def refresh(self, now=None, force=False):
+        """Rebuild the histogram from recorded transitions (cached for REFRESH_SECONDS)"""
+        now = datetime.now() if now is None else now
+        now_ts = now.timestamp()
+        if not force and self.built_at is not None and now_ts - self.built_at < REFRESH_SECONDS:
+            return self.probabilities
+
+        # Hour buckets covering the history window, aligned to local hour starts
+        end = now.replace(minute=0, second=0, microsecond=0)
+        start = end - timedelta(weeks=self.weeks)
+        transitions = self.timeline.transitions(self.user_id, start.timestamp(), now_ts)
+
+        online = np.zeros(HOURS_PER_WEEK)
+        covered = np.zeros(HOURS_PER_WEEK)
+
+        if transitions:
+            edges = np.array([(start + timedelta(hours=h)).timestamp()
+                              for h in range(self.weeks * HOURS_PER_WEEK + 1)])
+            slots = np.array([hour_of_week(start + timedelta(hours=h))
+                              for h in range(self.weeks * HOURS_PER_WEEK)])
+
+            ts = np.array([t for t, _ in transitions] + [now_ts])
+            is_online = np.array([status not in ('offline', 'unknown') for _, status in transitions], dtype=float)
+            is_known = np.array([status != 'unknown' for _, status in transitions], dtype=float)
+
+            # Cumulative online / tracked seconds at each transition, then evaluated at every
+            # hour edge by linear interpolation (both are piecewise linear between transitions)
+            durations = np.diff(ts)
+            cum_online = np.concatenate(([0.0], np.cumsum(durations * is_online)))
+            cum_tracked = np.concatenate(([0.0], np.cumsum(durations * is_known)))
+            online_at = np.interp(edges, ts, cum_online, left=0.0, right=cum_online[-1])
+            tracked_at = np.interp(edges, ts, cum_tracked, left=0.0, right=cum_tracked[-1])
+
+            online = np.bincount(slots, weights=np.diff(online_at), minlength=HOURS_PER_WEEK)
+            covered = np.bincount(slots, weights=np.diff(tracked_at), minlength=HOURS_PER_WEEK)
+
+        prior = PRIOR_HOURS * 3600
+        self.probabilities = (online + 0.5 * prior) / (covered + prior)
+        self.built_at = now_ts
+        return self.probabilities
+
+    def probability(self, when):
+        """Estimated chance the user is online at `when`"""
+        return float(self.probabilities[hour_of_week(when)])
+
+    def best_time(self, window_start, window_end, is_allowed):
+        """Allowed time in [window_start, window_end) with the highest online probability (or None)"""
+        self.refresh()
+
+        candidates = [window_start]
+        slot = window_start.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        while slot < window_end:
+            candidates.append(slot)
+            slot += timedelta(hours=1)
+
+        allowed = [when for when in candidates if is_allowed(when)]
+        if not allowed:
+            return None
+
+        scores = self.probabilities[[hour_of_week(when) for when in allowed]]
+        # argmax picks the earliest of equally good slots
+        return allowed[int(np.argmax(scores))]
@@ -0,0 +1,244 @@
+import os
+import struct
+import time
+
+# Presence timeline configuration
+TIMELINE_DIR = 'presence_timeline'
+HEARTBEAT_SECONDS = 60  # How often the running bot notes that presence is still being observed
+GAP_TOLERANCE_SECONDS = 300  # Shorter downtime (e.g. a quick restart) isn't recorded as a gap
+
+STATUS_CODES = {'offline': 0, 'online': 1, 'idle': 2, 'dnd': 3, 'unknown': 4}  # unknown = not observed (bot down)
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+
+# One record per transition: timestamp (epoch seconds), new status code
+TRANSITION = struct.Struct('<dB')
+# One rollup per UTC day: day number, offline seconds, online seconds,
+# longest offline stretch that ended that day
+DAILY = struct.Struct('<iddd')
+# Last time presence was known to be observed (epoch seconds)
+HEARTBEAT = struct.Struct('<d')
+
+DAY = 86400
+
+
+class PresenceTimeline:
+    """Append-only binary log of presence transitions with daily rollups"""
+
+    def __init__(self, directory=TIMELINE_DIR):
+        self.directory = directory
+
+    def _paths(self, user_id):
+        base = os.path.join(self.directory, str(user_id))
+        return f"{base}.bin", f"{base}.daily.bin", f"{base}.seen"
+
+    @staticmethod
+    def _count(f, record):
+        f.seek(0, os.SEEK_END)
+        return f.tell() // record.size
+
+    @staticmethod
+    def _read(f, record, index):
+        f.seek(index * record.size)
+        return record.unpack(f.read(record.size))
+
+    @classmethod
+    def _bisect(cls, f, record, key, count=None):
+        """Index of the first record whose first field is > key (records are sorted)"""
+        lo, hi = 0, cls._count(f, record) if count is None else count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if cls._read(f, record, mid)[0] <= key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def last_transition(self, user_id):
+        """(timestamp, status) of the most recent transition, or None"""
+        path, _, _ = self._paths(user_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            count = self._count(f, TRANSITION)
+            if count == 0:
+                return None
+            ts, code = self._read(f, TRANSITION, count - 1)
+        return ts, STATUS_NAMES[code]
+
+    def transitions(self, user_id, start, end=None):
+        """All (timestamp, status) transitions in [start, end), plus the one in effect at start"""
+        path, _, _ = self._paths(user_id)
+        if not os.path.exists(path):
+            return []
+        end = time.time() if end is None else end
+
+        result = []
+        with open(path, 'rb') as f:
+            count = self._count(f, TRANSITION)
+            i = max(0, self._bisect(f, TRANSITION, start, count) - 1)
+            j = self._bisect(f, TRANSITION, end, count)
+            f.seek(i * TRANSITION.size)
+            for ts, code in TRANSITION.iter_unpack(f.read((j - i) * TRANSITION.size)):
+                if ts >= end:
+                    break
+                result.append((ts, STATUS_NAMES[code]))
+        return result
+
+    def record(self, user_id, status, when=None):
+        """Append a transition (ignored if the status didn't change)"""
+        when = time.time() if when is None else when
+        last = self.last_transition(user_id)
+        if last is not None:
+            if last[1] == status:
+                return False
+            when = max(when, last[0])  # Keep the log sorted even if the clock steps back
+            self._roll_up(user_id, last[0], when, last[1])
+
+        os.makedirs(self.directory, exist_ok=True)
+        path, _, _ = self._paths(user_id)
+        with open(path, 'ab') as f:
+            f.write(TRANSITION.pack(when, STATUS_CODES[status]))
+        return True
+
+    def heartbeat(self, user_id, when=None):
+        """Note that presence is still being observed (so a crash loses at most HEARTBEAT_SECONDS)"""
+        when = time.time() if when is None else when
+        os.makedirs(self.directory, exist_ok=True)
+        _, _, seen_path = self._paths(user_id)
+        tmp_path = f"{seen_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(HEARTBEAT.pack(when))
+        os.replace(tmp_path, seen_path)
+
+    def last_heartbeat(self, user_id):
+        _, _, seen_path = self._paths(user_id)
+        try:
+            with open(seen_path, 'rb') as f:
+                return HEARTBEAT.unpack(f.read(HEARTBEAT.size))[0]
+        except (OSError, struct.error):
+            return None
+
+    def mark_gap(self, user_id, when=None):
+        """Record that presence stopped being observed at `when`, so the gap isn't counted as any status
+
+        With no `when` (on startup) the gap starts at the last heartbeat, or the last transition if
+        that's newer, since nothing after it was confirmed - unless that was only moments ago.
+        """
+        last = self.last_transition(user_id)
+        if last is None:
+            return False
+        if when is None:
+            when = max(last[0], self.last_heartbeat(user_id) or 0.0)
+            if time.time() - when < GAP_TOLERANCE_SECONDS:
+                return False
+        return self.record(user_id, 'unknown', when)
+
+    def _roll_up(self, user_id, start, end, status):
+        """Add a closed [start, end) interval to the daily rollups"""
+        _, daily_path, _ = self._paths(user_id)
+        mode = 'r+b' if os.path.exists(daily_path) else 'w+b'
+        with open(daily_path, mode) as f:
+            count = self._count(f, DAILY)
+            last = self._read(f, DAILY, count - 1) if count else None
+
+            day = int(start // DAY)
+            end_day = int(end // DAY)
+            while day <= end_day:
+                # Only the newest rollup is ever updated; earlier days are final
+                if last is not None and last[0] == day:
+                    index, (_, offline, online, longest) = count - 1, last
+                else:
+                    index, offline, online, longest = count, 0.0, 0.0, 0.0
+                    count += 1
+
+                overlap = max(0.0, min(end, (day + 1) * DAY) - max(start, day * DAY))
+                if status == 'offline':
+                    offline += overlap
+                    if day == end_day:
+                        longest = max(longest, end - start)
+                elif status != 'unknown':
+                    online += overlap
+
+                last = (day, offline, online, longest)
+                f.seek(index * DAILY.size)
+                f.write(DAILY.pack(*last))
+                day += 1
+
+    def _raw_stats(self, f, count, start, end, now):
+        """Seconds per status and longest ended absence in [start, end) from raw transitions"""
+        seconds = {name: 0.0 for name in STATUS_CODES}
+        longest = 0.0
+        if count == 0 or end <= start:
+            return seconds, longest
+
+        # The transition in effect at `start`, then every transition up to `end`
+        i = max(0, self._bisect(f, TRANSITION, start, count) - 1)
+        ts, code = self._read(f, TRANSITION, i)
+        while True:
+            if i + 1 < count:
+                next_ts, next_code = self._read(f, TRANSITION, i + 1)
+            else:
+                next_ts, next_code = now, None  # Still in this status
+
+            overlap = min(end, next_ts) - max(start, ts)
+            if overlap > 0:
+                seconds[STATUS_NAMES[code]] += overlap
+            if STATUS_NAMES[code] == 'offline' and next_code is not None and start <= next_ts < end:
+                longest = max(longest, next_ts - ts)
+
+            if next_code is None or next_ts >= end:
+                break
+            i, ts, code = i + 1, next_ts, next_code
+        return seconds, longest
+
+    def summary(self, user_id, start, end=None):
+        """Offline/online seconds in [start, end) and the longest absence that ended in it"""
+        now = time.time()
+        end = now if end is None else min(end, now)
+        path, daily_path, _ = self._paths(user_id)
+        result = {'offline': 0.0, 'online': 0.0, 'longest_absence': 0.0, 'current_absence': 0.0}
+        if not os.path.exists(path):
+            return result
+
+        with open(path, 'rb') as f:
+            count = self._count(f, TRANSITION)
+            if count == 0:
+                return result
+            last_ts, last_code = self._read(f, TRANSITION, count - 1)
+
+            # Whole days that are fully closed come from the rollups, the ragged edges from raw data
+            first_full_day = -(-int(start) // DAY)
+            end_full_day = min(int(end // DAY), int(last_ts // DAY))
+
+            edges = [(start, end)]
+            if first_full_day < end_full_day and os.path.exists(daily_path):
+                edges = [(start, first_full_day * DAY), (end_full_day * DAY, end)]
+                with open(daily_path, 'rb') as daily:
+                    lo = self._bisect(daily, DAILY, first_full_day - 1)
+                    hi = self._bisect(daily, DAILY, end_full_day - 1)
+                    for index in range(lo, hi):
+                        _, offline, online, longest = self._read(daily, DAILY, index)
+                        result['offline'] += offline
+                        result['online'] += online
+                        result['longest_absence'] = max(result['longest_absence'], longest)
+
+            for edge_start, edge_end in edges:
+                seconds, longest = self._raw_stats(f, count, edge_start, edge_end, now)
+                result['offline'] += seconds['offline']
+                result['online'] += seconds['online'] + seconds['idle'] + seconds['dnd']
+                result['longest_absence'] = max(result['longest_absence'], longest)
+
+            if STATUS_NAMES[last_code] == 'offline':
+                result['current_absence'] = now - self._absence_start(f, count)
+        return result
+
+    def _absence_start(self, f, count):
+        """Start of the ongoing absence, bridging bot downtime that began and ended with Beeg offline"""
+        start = None
+        for i in range(count - 1, -1, -1):
+            ts, code = self._read(f, TRANSITION, i)
+            if STATUS_NAMES[code] == 'offline':
+                start = ts
+            elif STATUS_NAMES[code] != 'unknown':
+                break
+        return start
@@ -0,0 +1,188 @@
+import json
+import os
+from bisect import bisect_right
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+# How far ahead each compiled interval table reaches before it is rebuilt
+COMPILE_HORIZON_DAYS = 14
+
+WEEKDAY_NAMES = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+
+
+def parse_clock(value):
+    """Parse 'HH:MM' (or an int hour) into a datetime.time"""
+    if isinstance(value, int):
+        return time(hour=value)
+    hour, _, minute = str(value).partition(':')
+    return time(hour=int(hour), minute=int(minute or 0))
+
+
+def parse_days(value):
+    """Parse a list of weekday numbers (0=Monday) or names into a set of ints"""
+    if value is None:
+        return set(range(7))
+    days = set()
+    for day in value:
+        if isinstance(day, int):
+            days.add(day)
+        else:
+            days.add(WEEKDAY_NAMES.index(str(day).lower()[:3]))
+    return days
+
+
+class QuietWindow:
+    """A single recurring quiet period, optionally scoped to a target and/or guild"""
+
+    def __init__(self, start, end, days=None, timezone=None, target_id=None, guild_id=None):
+        self.start = parse_clock(start)
+        self.end = parse_clock(end)
+        self.days = parse_days(days)
+        self.timezone = ZoneInfo(timezone) if timezone else None  # None = server local time
+        self.target_id = int(target_id) if target_id is not None else None
+        self.guild_id = int(guild_id) if guild_id is not None else None
+
+    @classmethod
+    def from_dict(cls, data, default_timezone=None):
+        return cls(
+            start=data['start'],
+            end=data['end'],
+            days=data.get('days'),
+            timezone=data.get('timezone', default_timezone),
+            target_id=data.get('target_id'),
+            guild_id=data.get('guild_id'),
+        )
+
+    @property
+    def is_empty(self):
+        """start == end means the window is switched off (as DO_NOT_DISTURB_START_HOUR == END_HOUR always did)"""
+        return self.start == self.end
+
+    def applies_to(self, target_id, guild_id):
+        return ((self.target_id is None or self.target_id == target_id) and
+                (self.guild_id is None or self.guild_id == guild_id))
+
+    def intervals(self, from_ts, until_ts):
+        """Yield (start_ts, end_ts) occurrences overlapping [from_ts, until_ts)"""
+        if self.is_empty:
+            return
+        # Start a day early so windows that began yesterday and cross midnight are included
+        first_day = datetime.fromtimestamp(from_ts, self.timezone).date() - timedelta(days=1)
+        last_day = datetime.fromtimestamp(until_ts, self.timezone).date()
+
+        day = first_day
+        while day <= last_day:
+            if day.weekday() in self.days:
+                start = datetime.combine(day, self.start, tzinfo=self.timezone)
+                end = datetime.combine(day, self.end, tzinfo=self.timezone)
+                if end <= start:
+                    end = datetime.combine(day + timedelta(days=1), self.end, tzinfo=self.timezone)
+                start_ts, end_ts = start.timestamp(), end.timestamp()
+                if end_ts > from_ts and start_ts < until_ts:
+                    yield start_ts, end_ts
+            day += timedelta(days=1)
+
+    def describe(self):
+        text = f"{self.start.strftime('%H:%M')}-{self.end.strftime('%H:%M')}"
+        if len(self.days) < 7:
+            text += f" ({', '.join(WEEKDAY_NAMES[d].title() for d in sorted(self.days))})"
+        if self.timezone:
+            text += f" {self.timezone.key}"
+        return text
+
+
+class QuietHoursEngine:
+    """Compiles quiet windows into sorted interval tables for O(log n) lookups"""
+
+    def __init__(self, windows, horizon_days=COMPILE_HORIZON_DAYS):
+        self.windows = list(windows)
+        self.horizon = horizon_days * 86400
+        self.tables = {}  # (target_id, guild_id) -> (valid_from, valid_until, starts, ends)
+
+    @classmethod
+    def from_file(cls, path, default_windows):
+        """Load windows from a JSON config file, falling back to the given defaults"""
+        if not os.path.exists(path):
+            return cls(default_windows)
+
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+
+        default_timezone = config.get('timezone')
+        windows = [QuietWindow.from_dict(w, default_timezone) for w in config.get('windows', [])]
+        print(f"Loaded {len(windows)} quiet-hours window(s) from {path}")
+        return cls(windows)
+
+    def _compile(self, target_id, guild_id, from_ts):
+        """Merge every applicable window into disjoint, sorted [start, end) intervals"""
+        until_ts = from_ts + self.horizon
+        occurrences = sorted(
+            interval
+            for window in self.windows if window.applies_to(target_id, guild_id)
+            for interval in window.intervals(from_ts, until_ts)
+        )
+
+        starts, ends = [], []
+        for start, end in occurrences:
+            if ends and start <= ends[-1]:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+
+        table = (from_ts, until_ts, starts, ends)
+        self.tables[(target_id, guild_id)] = table
+        return table
+
+    def _table(self, target_id, guild_id, ts):
+        table = self.tables.get((target_id, guild_id))
+        # Keep a day of slack so a lookup never runs off the end of the table
+        if table is None or not (table[0] <= ts <= table[1] - 86400):
+            # Start a day back (on a day boundary) so lookups a little before this one,
+            # e.g. "now" after the summoning loop looked a few hours ahead, reuse the table
+            table = self._compile(target_id, guild_id, (ts // 86400 - 1) * 86400)
+        return table
+
+    def _quiet_interval(self, ts, target_id, guild_id):
+        """Return the (start, end) interval containing ts, or None"""
+        _, _, starts, ends = self._table(target_id, guild_id, ts)
+        i = bisect_right(starts, ts) - 1
+        if i >= 0 and ts < ends[i]:
+            return starts[i], ends[i]
+        return None
+
+    @staticmethod
+    def _to_ts(when):
+        return (when or datetime.now()).timestamp()
+
+    @staticmethod
+    def _from_ts(ts, like):
+        # Answer in the same flavour (naive local or aware) the caller asked in
+        tz = like.tzinfo if like is not None else None
+        return datetime.fromtimestamp(ts, tz)
+
+    def is_quiet(self, when=None, target_id=None, guild_id=None):
+        """Is `when` (default: now) inside a quiet window?"""
+        return self._quiet_interval(self._to_ts(when), target_id, guild_id) is not None
+
+    def next_allowed(self, when=None, target_id=None, guild_id=None):
+        """Earliest instant at or after `when` that is outside every quiet window"""
+        ts = self._to_ts(when)
+        interval = self._quiet_interval(ts, target_id, guild_id)
+        if interval is None:
+            return self._from_ts(ts, when)
+        return self._from_ts(interval[1], when)
+
+    def next_quiet_start(self, when=None, target_id=None, guild_id=None):
+        """Start of the next quiet window after `when` (None if there is none within the horizon)"""
+        ts = self._to_ts(when)
+        _, _, starts, _ = self._table(target_id, guild_id, ts)
+        i = bisect_right(starts, ts)
+        if i < len(starts):
+            return self._from_ts(starts[i], when)
+        return None
+
+    def describe(self, target_id=None, guild_id=None):
+        """Human-readable list of the windows that apply to a target/guild"""
+        windows = [w.describe() for w in self.windows if w.applies_to(target_id, guild_id) and not w.is_empty]
+        return ', '.join(windows) if windows else 'none'
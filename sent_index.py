@@ -0,0 +1,99 @@
+import bisect
+import json
+import os
+
+# Sent message index configuration
+SENT_INDEX_FILE = 'sent_messages.json'
+SENT_INDEX_MAX_PER_CHANNEL = 1000  # Oldest ids are forgotten past this (the channel then needs a rescan)
+SENT_INDEX_MAX_CHANNELS = 100      # Least recently used channels are forgotten past this
+
+
+class SentMessageIndex:
+    """Bounded, persisted record of the ids of messages the bot has sent, per channel
+
+    A channel is `complete` once a history scan has seeded it: from then on every message
+    the bot sends there is recorded, so cleanups can work from the index alone. Channels
+    that were never scanned, or that lost ids to the size bound, still need a scan.
+    """
+
+    def __init__(self, path=SENT_INDEX_FILE, max_per_channel=SENT_INDEX_MAX_PER_CHANNEL,
+                 max_channels=SENT_INDEX_MAX_CHANNELS):
+        self.path = path
+        self.max_per_channel = max_per_channel
+        self.max_channels = max_channels
+        self.channels = {}  # channel id -> {'complete': bool, 'ids': [message ids, oldest first]}
+
+    def load(self):
+        """Load the index from disk (call before recording anything)"""
+        self.channels = {}
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                stored = json.load(f).get('channels', {})
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"Could not read {self.path}, starting with an empty sent message index: {e}")
+            return
+
+        for channel_id, record in stored.items():
+            self.channels[int(channel_id)] = {'complete': record.get('complete', False),
+                                              'ids': sorted(record.get('ids', []))}
+
+    def save(self):
+        """Persist the index atomically"""
+        data = {'channels': {str(channel_id): record for channel_id, record in self.channels.items()}}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def _channel(self, channel_id):
+        record = self.channels.pop(channel_id, None)
+        if record is None:
+            record = {'complete': False, 'ids': []}
+        self.channels[channel_id] = record  # Re-insert so dict order is least -> most recently used
+
+        while len(self.channels) > self.max_channels:
+            del self.channels[next(iter(self.channels))]
+        return record
+
+    def _trim(self, record):
+        if len(record['ids']) > self.max_per_channel:
+            del record['ids'][:-self.max_per_channel]
+            record['complete'] = False  # Forgotten ids can only be found by scanning again
+
+    def record(self, channel_id, message_id):
+        """Remember a message the bot just sent"""
+        record = self._channel(channel_id)
+        if message_id in record['ids']:
+            return
+        bisect.insort(record['ids'], message_id)
+        self._trim(record)
+        self.save()
+
+    def seed(self, channel_id, message_ids):
+        """Add the result of a full history scan, after which the channel needs no more scans"""
+        record = self._channel(channel_id)
+        record['ids'] = sorted(set(record['ids']).union(message_ids))
+        record['complete'] = True
+        self._trim(record)
+        self.save()
+
+    def message_ids(self, channel_id):
+        """Recorded ids for a channel (oldest first), or None if the channel needs a history scan"""
+        record = self.channels.get(channel_id)
+        if record is None or not record['complete']:
+            return None
+        return list(record['ids'])
+
+    def forget(self, channel_id, message_ids):
+        """Drop ids of messages that have been deleted"""
+        record = self.channels.get(channel_id)
+        if record is None:
+            return
+        gone = set(message_ids)
+        kept = [message_id for message_id in record['ids'] if message_id not in gone]
+        if len(kept) != len(record['ids']):
+            record['ids'] = kept
+            self.save()
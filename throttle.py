@@ -0,0 +1,109 @@
+import time
+
+# Token bucket sizes (burst) and refill periods (seconds per token) for /summon
+USER_BUCKET_CAPACITY = 3
+USER_REFILL_SECONDS = 60
+CHANNEL_BUCKET_CAPACITY = 5
+CHANNEL_REFILL_SECONDS = 30
+TARGET_BUCKET_CAPACITY = 5
+TARGET_REFILL_SECONDS = 60
+
+# Identical summons (same channel + target) inside this window collapse into one
+DEDUP_WINDOW_SECONDS = 10
+
+# Only tell a user they're being throttled once per this many seconds
+NOTICE_COOLDOWN_SECONDS = 15
+
+# Forget idle buckets after this long so the dicts stay small
+IDLE_BUCKET_SECONDS = 3600
+
+
+class TokenBucket:
+    """Classic token bucket: `capacity` burst, one token every `refill_seconds`"""
+
+    __slots__ = ('capacity', 'refill_seconds', 'tokens', 'updated')
+
+    def __init__(self, capacity, refill_seconds, now):
+        self.capacity = capacity
+        self.refill_seconds = refill_seconds
+        self.tokens = float(capacity)
+        self.updated = now
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) / self.refill_seconds)
+        self.updated = now
+
+    def retry_after(self, now):
+        """Seconds until a token is available (0 if one is available now)"""
+        self.refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) * self.refill_seconds
+
+    def take(self):
+        self.tokens -= 1
+
+
+class SummonThrottle:
+    """Per-user, per-channel and per-target rate limiting plus duplicate collapsing"""
+
+    def __init__(self):
+        self.user_buckets = {}
+        self.channel_buckets = {}
+        self.target_buckets = {}
+        self.recent_summons = {}  # (channel_id, target_id) -> monotonic time of last accepted summon
+        self.last_notice = {}  # user_id -> monotonic time we last told them they were throttled
+        self.last_prune = time.monotonic()
+
+    def _bucket(self, buckets, key, capacity, refill_seconds, now):
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = TokenBucket(capacity, refill_seconds, now)
+        return bucket
+
+    def check(self, user_id, channel_id, target_id):
+        """Try to admit a summon. Returns (allowed, reason, retry_after_seconds)."""
+        now = time.monotonic()
+        self._prune(now)
+
+        last = self.recent_summons.get((channel_id, target_id))
+        if last is not None and now - last < DEDUP_WINDOW_SECONDS:
+            return False, 'duplicate', DEDUP_WINDOW_SECONDS - (now - last)
+
+        buckets = [
+            ('user', self._bucket(self.user_buckets, user_id, USER_BUCKET_CAPACITY, USER_REFILL_SECONDS, now)),
+            ('channel', self._bucket(self.channel_buckets, channel_id, CHANNEL_BUCKET_CAPACITY, CHANNEL_REFILL_SECONDS, now)),
+            ('target', self._bucket(self.target_buckets, target_id, TARGET_BUCKET_CAPACITY, TARGET_REFILL_SECONDS, now)),
+        ]
+
+        # Only spend tokens if every bucket can pay, so a rejection costs nothing
+        for reason, bucket in buckets:
+            wait = bucket.retry_after(now)
+            if wait > 0:
+                return False, reason, wait
+
+        for _, bucket in buckets:
+            bucket.take()
+        self.recent_summons[(channel_id, target_id)] = now
+        return True, None, 0.0
+
+    def should_notify(self, user_id):
+        """Whether a throttled user should get a notice (at most one per cooldown)"""
+        now = time.monotonic()
+        last = self.last_notice.get(user_id)
+        if last is not None and now - last < NOTICE_COOLDOWN_SECONDS:
+            return False
+        self.last_notice[user_id] = now
+        return True
+
+    def _prune(self, now):
+        if now - self.last_prune < IDLE_BUCKET_SECONDS:
+            return
+        self.last_prune = now
+
+        for buckets in (self.user_buckets, self.channel_buckets, self.target_buckets):
+            for key in [k for k, b in buckets.items() if now - b.updated > IDLE_BUCKET_SECONDS]:
+                del buckets[key]
+        for table in (self.recent_summons, self.last_notice):
+            for key in [k for k, t in table.items() if now - t > IDLE_BUCKET_SECONDS]:
+                del table[key]